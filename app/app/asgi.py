@@ -2,6 +2,8 @@
 ASGI config for app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Streaming responses, such as the ticket export, are iterated in a worker
+thread by ``StreamingASGIHandler`` so they can read the database.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -9,8 +11,11 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+from core.concurrency import StreamingASGIHandler  # noqa: E402
+
+application = StreamingASGIHandler()
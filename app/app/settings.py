@@ -16,6 +16,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'user',
     'ticket',
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryCountMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,13 +56,31 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'app.wsgi.application'
 
+# Persistent connections are kept for DB_CONN_MAX_AGE seconds ("none" keeps
+# them forever). With DB_POOL=true connections are instead returned to a
+# per-process pool at the end of each request; a thread needing one while
+# all DB_POOL_MAX_SIZE are in use waits up to DB_POOL_TIMEOUT seconds.
+DB_POOL = os.environ.get('DB_POOL', 'false').lower() == 'true'
+DB_CONN_MAX_AGE = os.environ.get('DB_CONN_MAX_AGE', '0' if DB_POOL else '60')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.postgresql',
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': (
+            None if DB_CONN_MAX_AGE.lower() == 'none' else int(DB_CONN_MAX_AGE)
+        ),
+        'CONN_HEALTH_CHECKS': (
+            os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+        ),
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 20)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        } if DB_POOL else None,
     }
 }
 
@@ -79,6 +99,20 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# The first hasher hashes new passwords; hashes made by the others are
+# still accepted and upgraded on the next login. Argon2 needs the
+# argon2-cffi package.
+PASSWORD_HASHER_CHOICES = {
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CHOICES.items()
+    if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
 LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
@@ -97,4 +131,45 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 50)),
 }
+
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(
+    os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000)
+)
+
+EVENT_CACHE = {
+    'ALIAS': os.environ.get('EVENT_CACHE_ALIAS', 'default'),
+    'TIMEOUT': int(os.environ.get('EVENT_CACHE_TIMEOUT', 60)),
+}
+
+# Login attempts allowed per client IP, e.g. "10/min"; empty disables.
+LOGIN_THROTTLE_RATE = os.environ.get('LOGIN_THROTTLE_RATE', '10/min') or None
+
+# Seconds a seat hold lasts before it is released.
+HOLD_TTL = int(os.environ.get('HOLD_TTL', 600))
+
+# Seconds an API token stays valid after it was last used, and the
+# minimum seconds between writes recording its use.
+TOKEN_TTL = int(os.environ.get('TOKEN_TTL', 30 * 24 * 3600))
+TOKEN_TOUCH_INTERVAL = int(os.environ.get('TOKEN_TOUCH_INTERVAL', 300))
+
+# Background jobs: attempts before a job is marked failed, and the base and
+# maximum seconds of the exponential backoff between attempts.
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+JOB_RETRY_DELAY = float(os.environ.get('JOB_RETRY_DELAY', 2))
+JOB_RETRY_DELAY_MAX = float(os.environ.get('JOB_RETRY_DELAY_MAX', 3600))
+
+# Seconds the response of a request with an Idempotency-Key is replayed.
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))
+
+# Token lookups cached per process, or in the TOKEN_CACHE_ALIAS cache which
+# every worker shares; set it when running more than one process so deleted
+# tokens and deactivated users are rejected by all of them immediately.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_CACHE_SIZE', 10000)),
+    'TTL': int(os.environ.get('TOKEN_CACHE_TTL', 60)),
+    'SHARED_CACHE': os.environ.get('TOKEN_CACHE_ALIAS') or None,
+}
+
+SILENCED_SYSTEM_CHECKS = ['rest_framework.W001']
@@ -1,14 +1,51 @@
 '''
 Django admin custumization
 '''
+import json
+
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 
 
 from core import models
 
 
+class EstimatedCountPaginator(Paginator):
+    '''
+    Paginator using the planner's row estimate for large result sets.
+
+    An exact `COUNT(*)` is only run when the estimate is below
+    `ADMIN_ESTIMATED_COUNT_THRESHOLD`.
+    '''
+
+    @cached_property
+    def count(self):
+        '''Return the estimated, or for small results exact, row count.'''
+        threshold = settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        estimate = self.estimate()
+        if estimate is not None and estimate >= threshold:
+            return estimate
+        return super().count
+
+    def estimate(self):
+        '''Return the planner's row estimate for the object list.'''
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return None
+        sql, params = query.sql_with_params()
+        with connections[self.object_list.db].cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
 class UserAdmin(BaseUserAdmin):
     '''Define the admin pages for users.'''
     ordering = ['id']
@@ -44,6 +81,30 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class EventAdmin(admin.ModelAdmin):
+    '''Define the admin pages for events.'''
+    ordering = ['-started_at', '-id']
+    list_display = ['name', 'started_at', 'owner', 'capacity', 'sold']
+    list_select_related = ['owner']
+    raw_id_fields = ['owner']
+    search_fields = ['owner__email__exact']
+    readonly_fields = ['sold', 'paid_count', 'revenue']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class TicketAdmin(admin.ModelAdmin):
+    '''Define the admin pages for tickets.'''
+    ordering = ['-id']
+    list_display = ['id', 'event', 'owner', 'price', 'paid', 'created_at']
+    list_select_related = ['event', 'owner']
+    raw_id_fields = ['owner', 'event']
+    search_fields = ['owner__email__exact']
+    list_filter = ['paid']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Event)
-admin.site.register(models.Ticket)
+admin.site.register(models.Event, EventAdmin)
+admin.site.register(models.Ticket, TicketAdmin)
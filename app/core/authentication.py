@@ -0,0 +1,255 @@
+'''
+Expiring token authentication with a cached token -> user lookup.
+'''
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from core.concurrency import database_sync_to_async
+from core.models import AuthToken
+
+
+class TokenCache:
+    '''
+    Bounded LRU cache of `token key -> (user, token)` with a TTL.
+
+    When `shared_cache` names a Django cache alias, entries live only in
+    that cache, which every worker reads, so deleting a token or changing
+    a user invalidates it in all processes at once. Otherwise entries
+    live in process memory, where invalidation only reaches the current
+    process; deployments running several processes must configure a
+    shared cache.
+    '''
+    key_prefix = 'token-auth:'
+
+    def __init__(self, max_size=10000, ttl=60, shared_cache=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        '''Return the shared cache backend, if one is configured.'''
+        if self.shared_cache is None:
+            return None
+        return caches[self.shared_cache]
+
+    @property
+    def in_process(self):
+        '''Return whether lookups stay in process memory, without I/O.'''
+        return self.shared_cache is None
+
+    def get(self, key):
+        '''Return a copy of the cached `(user, token)` or `None`.'''
+        shared = self.shared
+        if shared is not None:
+            user_token = shared.get(self.key_prefix + key)
+            if user_token is None:
+                return None
+            return self._copy(user_token)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user_token, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+        return self._copy(user_token)
+
+    def set(self, key, user_token):
+        '''Cache the `(user, token)` pair authenticated by `key`.'''
+        shared = self.shared
+        if shared is not None:
+            shared.set(self.key_prefix + key, user_token, self.ttl)
+        else:
+            self._store_local(key, user_token, time.monotonic())
+
+    def invalidate(self, *keys):
+        '''Drop the given token keys, locally and from the shared cache.'''
+        with self._lock:
+            for key in keys:
+                self._discard(key)
+        shared = self.shared
+        if shared is not None and keys:
+            shared.delete_many([self.key_prefix + key for key in keys])
+
+    def invalidate_user(self, user_id, keys=()):
+        '''Drop every cached token belonging to `user_id`.'''
+        with self._lock:
+            known = self._keys_by_user.get(user_id, set())
+            keys = set(keys) | known
+        self.invalidate(*keys)
+
+    def clear(self):
+        '''Empty the in-process entries.'''
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _store_local(self, key, user_token, now):
+        '''Insert into the LRU, evicting the least recently used entry.'''
+        user_id = user_token[0].pk
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (user_token, now + self.ttl)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        '''Remove `key` from the LRU; the lock must be held.'''
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[0][0].pk
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    @staticmethod
+    def _copy(user_token):
+        '''Return copies so requests never share mutable instances.'''
+        user, token = user_token
+        user = copy.copy(user)
+        token = copy.copy(token)
+        token.user = user
+        return user, token
+
+
+def build_token_cache():
+    '''Create the token cache from the `TOKEN_AUTH_CACHE` setting.'''
+    options = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+    return TokenCache(
+        max_size=options.get('MAX_SIZE', 10000),
+        ttl=options.get('TTL', 60),
+        shared_cache=options.get('SHARED_CACHE'),
+    )
+
+
+token_cache = build_token_cache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    '''
+    Expiring token authentication that skips the database on cache hits.
+
+    The database is only written to when a token's use is due to be
+    recorded, at most once per `TOKEN_TOUCH_INTERVAL`.
+    '''
+    model = AuthToken
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        '''Return `(user, token)` for `key`, from the cache if possible.'''
+        user_token = self.cache.get(key)
+        if user_token is None:
+            user_token = super().authenticate_credentials(key)
+            self.cache.set(key, user_token)
+
+        user, token = user_token
+        now = timezone.now()
+        self.check_expiry(key, token, now)
+        if token.needs_touch(now):
+            token.touch(now)
+            self.cache.set(key, (user, token))
+        return user, token
+
+    def check_expiry(self, key, token, now=None):
+        '''Raise `AuthenticationFailed` if `token` has expired.'''
+        if token.expires_at <= (now or timezone.now()):
+            self.cache.invalidate(key)
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+
+
+class AsyncTokenAuthentication(CachedTokenAuthentication):
+    '''
+    Token authentication for async views. Hits in the in-process cache
+    are answered on the event loop; lookups in a shared cache, which may
+    be a network round trip, run in a worker thread.
+    '''
+
+    def get_key(self, request):
+        '''Return the token key sent with `request`, or `None`.'''
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _('Invalid token header. No credentials provided.')
+            raise exceptions.AuthenticationFailed(msg)
+        if len(auth) > 2:
+            msg = _('Invalid token header. '
+                    'Token string should not contain spaces.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            msg = _('Invalid token header. '
+                    'Token string should not contain invalid characters.')
+            raise exceptions.AuthenticationFailed(msg)
+
+    async def authenticate_async(self, request):
+        '''Return `(user, token)`, hitting the database only on a miss.'''
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        if self.cache.in_process:
+            user_token = self.cache.get(key)
+            if user_token is not None:
+                token = user_token[1]
+                self.check_expiry(key, token)
+                if not token.needs_touch():
+                    return user_token
+
+        return await database_sync_to_async(self.authenticate_credentials)(
+            key
+        )
+
+
+def token_required(view):
+    '''Authenticate an async view with a token, answering 401 if absent.'''
+    authentication = AsyncTokenAuthentication()
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user_token = await authentication.authenticate_async(request)
+        except exceptions.AuthenticationFailed as error:
+            detail = error.detail
+        else:
+            if user_token is not None:
+                request.user, request.auth = user_token
+                return await view(request, *args, **kwargs)
+            detail = exceptions.NotAuthenticated.default_detail
+
+        response = JsonResponse({'detail': detail}, status=401)
+        response['WWW-Authenticate'] = authentication.authenticate_header(
+            request
+        )
+        return response
+
+    return wrapper
@@ -0,0 +1,115 @@
+'''
+Helpers for async views and the blocking code they call.
+'''
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections, connection
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.middleware import current_query_stats
+
+
+def database_sync_to_async(func):
+    '''
+    Run `func` in a worker thread with its own database connection.
+
+    Django 3.2 has no async ORM, so async views do all of a request's
+    database work in one hop. Stale connections are recycled on the way in
+    and out, as `request_started`/`request_finished` do for sync requests,
+    and queries are counted towards the current request's stats.
+    '''
+    @functools.wraps(func)
+    def inner(*args, **kwargs):
+        close_old_connections()
+        stats = current_query_stats.get()
+        try:
+            if stats is None:
+                return func(*args, **kwargs)
+            with connection.execute_wrapper(stats):
+                return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(inner, thread_sensitive=False)
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    '''Return a JSON response encoded like DRF's renderer.'''
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def read_only(view):
+    '''Answer 405 to anything but GET/HEAD and JSON-encode API errors.'''
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            response = json_response(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status=status.HTTP_405_METHOD_NOT_ALLOWED,
+            )
+            response['Allow'] = 'GET, HEAD'
+            return response
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as error:
+            detail = error.detail
+            if not isinstance(detail, (list, dict)):
+                detail = {'detail': detail}
+            return json_response(detail, status=error.status_code)
+
+    return wrapper
+
+
+class StreamingASGIHandler(ASGIHandler):
+    '''
+    ASGI handler that iterates streaming responses off the event loop.
+
+    Django 3.2 iterates `StreamingHttpResponse` content on the event loop,
+    so a generator reading the database, like the ticket export, fails
+    with `SynchronousOnlyOperation` after the headers are sent. Here each
+    part is produced in the thread that ran the sync view, keeping a
+    server-side cursor on the connection that opened it.
+    '''
+
+    async def send_response(self, response, send):
+        '''Send a response, producing streamed parts in a thread.'''
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            value = cookie.output(header='').encode('ascii').strip()
+            headers.append((b'Set-Cookie', value))
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        try:
+            while True:
+                part = await next_part(parts, None)
+                if part is None:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send({'type': 'http.response.body'})
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
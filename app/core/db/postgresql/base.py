@@ -0,0 +1,164 @@
+'''
+PostgreSQL backend with connection health checks and optional pooling.
+
+Extra `DATABASES` keys understood by this backend:
+
+- `CONN_HEALTH_CHECKS`: ping a persistent connection with `SELECT 1` the
+  first time it is used in each request and reconnect if it is dead.
+- `POOL`: `None`, or a dict with `MIN_SIZE`/`MAX_SIZE`/`TIMEOUT`, to
+  keep open connections in a per-process `psycopg2` pool. Closing a
+  connection returns it to the pool instead of tearing down the TCP/TLS
+  session. When all `MAX_SIZE` connections are in use, a thread waits up
+  to `TIMEOUT` seconds for one to be returned.
+'''
+import threading
+
+import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+from django.db.backends.postgresql import base
+
+from core.db.postgresql.creation import DatabaseCreation
+
+
+class BlockingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    '''
+    Thread-safe pool whose `getconn` waits for a free connection.
+
+    `ThreadedConnectionPool` raises `PoolError` as soon as `maxconn`
+    connections are checked out; here the caller blocks for up to
+    `timeout` seconds first, then gets an `OperationalError` like any
+    other failure to connect.
+    '''
+
+    def __init__(self, minconn, maxconn, *args, timeout=30, **kwargs):
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        '''Return a connection, waiting while all of them are in use.'''
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.OperationalError(
+                f'No connection was returned to the pool within '
+                f'{self.timeout} seconds.'
+            )
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        '''Return a connection and wake up a waiting thread.'''
+        super().putconn(conn, key, close)
+        self._slots.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    '''PostgreSQL database wrapper with health checks and pooling.'''
+    creation_class = DatabaseCreation
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        self.pool = None
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def get_pool(self, conn_params):
+        '''Return the process-wide pool for these connection parameters.'''
+        options = self.settings_dict['POOL']
+        key = (self.alias, tuple(sorted(conn_params.items())))
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = BlockingConnectionPool(
+                    options.get('MIN_SIZE', 1),
+                    options.get('MAX_SIZE', 20),
+                    timeout=options.get('TIMEOUT', 30),
+                    **conn_params,
+                )
+                self._pools[key] = pool
+        return pool
+
+    @classmethod
+    def close_pools(cls):
+        '''Close every pooled connection of this process.'''
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.closeall()
+            cls._pools.clear()
+
+    def checkout(self, pool):
+        '''Take a working connection from the pool.'''
+        for _ in range(pool.maxconn + 1):
+            connection = pool.getconn()
+            if not connection.closed and self.ping(connection):
+                return connection
+            pool.putconn(connection, close=True)
+        return pool.getconn()
+
+    def ping(self, connection):
+        '''Return whether a pooled connection still answers.'''
+        if not self.health_check_enabled:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        if not self.settings_dict.get('POOL'):
+            self.pool = None
+            return super().get_new_connection(conn_params)
+
+        self.pool = self.get_pool(conn_params)
+        connection = self.checkout(self.pool)
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+
+        with self.wrap_database_errors:
+            self.pool.putconn(
+                self.connection,
+                close=self.in_atomic_block or self.connection.closed,
+            )
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        '''Check a reused connection once per request before using it.'''
+        if (
+            self.connection is not None and
+            self.health_check_enabled and
+            not self.health_check_done and
+            not self.in_atomic_block
+        ):
+            if not self.is_usable():
+                self.close()
+        self.health_check_done = True
+        super().ensure_connection()
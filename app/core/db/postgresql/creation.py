@@ -0,0 +1,12 @@
+'''
+Test database creation for the pooled PostgreSQL backend.
+'''
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    '''Close pooled connections before dropping a test database.'''
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        self.connection.close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
@@ -0,0 +1,109 @@
+'''
+Bulk factories for seeding large volumes of data.
+'''
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import Count, DecimalField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Event, Ticket
+
+
+def chunks(count, size):
+    '''Yield the sizes of consecutive batches covering `count` items.'''
+    while count > 0:
+        yield min(count, size)
+        count -= size
+
+
+def create_users(count, password='testpass123', batch_size=1000):
+    '''Create `count` users sharing one pre-hashed password.'''
+    User = get_user_model()
+    hashed = make_password(password)
+    prefix = timezone.now().strftime('%Y%m%d%H%M%S%f')
+    users = []
+    created = 0
+    for size in chunks(count, batch_size):
+        users += User.objects.bulk_create(
+            User(
+                email=f'user{prefix}-{created + index}@example.com',
+                name=f'User {created + index}',
+                password=hashed,
+            )
+            for index in range(size)
+        )
+        created += size
+    return users
+
+
+def create_events(owners, count, batch_size=1000):
+    '''Create `count` events spread over the next year.'''
+    now = timezone.now()
+    events = []
+    created = 0
+    for size in chunks(count, batch_size):
+        events += Event.objects.bulk_create(
+            Event(
+                owner=random.choice(owners),
+                name=f'Event {created + index}',
+                description='Seeded event',
+                started_at=now + timedelta(hours=random.randint(-720, 8760)),
+                duration_hours=Decimal('3.00'),
+            )
+            for index in range(size)
+        )
+        created += size
+    return events
+
+
+def create_tickets(owners, events, count, paid_ratio=0.5, batch_size=5000):
+    '''Create `count` tickets spread evenly over `owners`.'''
+    now = timezone.now()
+    created = 0
+    for size in chunks(count, batch_size):
+        tickets = []
+        for index in range(created, created + size):
+            paid = random.random() < paid_ratio
+            tickets.append(Ticket(
+                owner=owners[index % len(owners)],
+                event=random.choice(events),
+                price=Decimal(random.randint(500, 15000)) / 100,
+                paid=paid,
+                paid_at=now if paid else None,
+            ))
+        Ticket.objects.bulk_create(tickets)
+        created += size
+    refresh_event_counters()
+
+
+def refresh_event_counters():
+    '''Recompute every event's sales counters from its tickets.'''
+    tickets = Ticket.objects.filter(event=OuterRef('pk')).order_by()
+    count = tickets.values('event').annotate(total=Count('id'))
+    paid = tickets.filter(paid=True).values('event')
+    revenue_field = DecimalField(max_digits=12, decimal_places=2)
+    Event.objects.update(
+        sold=Coalesce(Subquery(count.values('total')), 0),
+        paid_count=Coalesce(
+            Subquery(paid.annotate(total=Count('id')).values('total')),
+            0,
+        ),
+        revenue=Coalesce(
+            Subquery(paid.annotate(total=Sum('price')).values('total')),
+            Decimal('0'),
+            output_field=revenue_field,
+        ),
+    )
+
+
+def seed(users=100, events=50, tickets=10000, password='testpass123'):
+    '''Seed users, events and tickets and return the created users.'''
+    created_users = create_users(users, password=password)
+    created_events = create_events(created_users, events)
+    create_tickets(created_users, created_events, tickets)
+    return created_users
@@ -0,0 +1,109 @@
+'''
+Replay of retried write requests sent with an `Idempotency-Key` header.
+'''
+import functools
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from core.models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+class IdempotencyKeyReused(APIException):
+    '''Raised when a key is sent again with a different request.'''
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = _(
+        'This Idempotency-Key was already used for a different request.'
+    )
+    default_code = 'idempotency_key_reused'
+
+
+def get_fingerprint(request):
+    '''Return a digest of the method, path and body of a request.'''
+    digest = hashlib.sha256()
+    for part in (
+        request.method,
+        request.get_full_path(),
+        request.content_type,
+    ):
+        digest.update(part.encode())
+        digest.update(b'\0')
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def claim(user, key, fingerprint, now):
+    '''
+    Return the record of `key` for `user`, inserting it if missing.
+
+    `INSERT ... ON CONFLICT DO NOTHING` waits for a concurrent insert of
+    the same key to commit, so a retry never runs alongside the original.
+    '''
+    IdempotencyKey.objects.bulk_create([
+        IdempotencyKey(
+            user=user,
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+        ),
+    ], ignore_conflicts=True)
+    return IdempotencyKey.objects.get(user=user, key=key)
+
+
+def idempotent(handler):
+    '''
+    Decorate a viewset action so retries with the same key are replayed.
+
+    The key is claimed and the response stored in the same transaction
+    as the action's writes. A concurrent retry waits on the unique index
+    until the first request commits, then replays its response without
+    running the action. Only successful responses are stored; after an
+    error the client may retry with the same key.
+    '''
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return handler(view, request, *args, **kwargs)
+        if not key or len(key) > 255:
+            raise ValidationError(
+                {HEADER: 'Must be between 1 and 255 characters.'}
+            )
+
+        fingerprint = get_fingerprint(request._request)
+        now = timezone.now()
+        with transaction.atomic():
+            record = claim(request.user, key, fingerprint, now)
+            if record.status_code is not None and record.expires_at <= now:
+                record.delete()
+                record = claim(request.user, key, fingerprint, now)
+
+            if record.status_code is not None:
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused()
+                response = Response(record.response, record.status_code)
+                response[REPLAYED_HEADER] = 'true'
+                return response
+
+            response = handler(view, request, *args, **kwargs)
+            if not status.is_success(response.status_code):
+                transaction.set_rollback(True)
+                return response
+
+            record.status_code = response.status_code
+            record.response = response.data
+            record.save(update_fields=['status_code', 'response'])
+        return response
+
+    return wrapper
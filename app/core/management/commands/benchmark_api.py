@@ -0,0 +1,194 @@
+'''
+Django command to benchmark the API endpoints against seeded data.
+'''
+import json
+import math
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import factories
+from core.authentication import token_cache
+from core.models import AuthToken, Event, Ticket
+
+PASSWORD = 'benchmark-pass'
+
+
+def percentile(values, percent):
+    '''Return the nearest-rank percentile of `values`.'''
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies, queries):
+    '''Return latency (ms) and query count statistics.'''
+    latencies = [latency * 1000 for latency in latencies]
+    return {
+        'requests': len(latencies),
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies), 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p90': round(percentile(latencies, 90), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(max(latencies), 3),
+        },
+        'queries': {
+            'mean': round(statistics.mean(queries), 2),
+            'max': max(queries),
+        },
+    }
+
+
+class Command(BaseCommand):
+    '''Django command to benchmark the API endpoints.'''
+    help = (
+        'Seed a throwaway test database with users, events and tickets, '
+        'time every endpoint with the test client and write a JSON report.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--events', type=int, default=50)
+        parser.add_argument('--tickets', type=int, default=10000)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--output', default='benchmark-report.json')
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+        )
+        allowed_hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=allowed_hosts,
+                LOGIN_THROTTLE_RATE=None,
+            ):
+                report = self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+
+        for name, stats in report['endpoints'].items():
+            latency = stats['latency_ms']
+            self.stdout.write(
+                f'{name:<20} p50 {latency["p50"]:>8.2f} ms  '
+                f'p99 {latency["p99"]:>8.2f} ms  '
+                f'queries {stats["queries"]["mean"]:>6.2f}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Report written to {options["output"]}'
+        ))
+
+    def benchmark(self, options):
+        '''Seed the data and return the report.'''
+        caches['default'].clear()
+        token_cache.clear()
+        users = factories.seed(
+            users=options['users'],
+            events=options['events'],
+            tickets=options['tickets'],
+            password=PASSWORD,
+        )
+        self.user = users[0]
+        self.event = Event.objects.order_by('id').first()
+        token = AuthToken.objects.issue(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        total = options['warmup'] + options['iterations']
+        self.unpaid = list(Ticket.objects.bulk_create(
+            Ticket(owner=self.user, event=self.event, price=10)
+            for _ in range(total)
+        ))
+        self.deep_page = self.find_deep_page()
+
+        endpoints = {}
+        for name, request in self.get_requests():
+            endpoints[name] = self.measure(
+                request, options['warmup'], options['iterations']
+            )
+
+        return {
+            'config': {
+                key: options[key]
+                for key in ('users', 'events', 'tickets', 'iterations')
+            },
+            'endpoints': endpoints,
+        }
+
+    def find_deep_page(self, depth=10):
+        '''Return the URL of a ticket list page `depth` pages deep.'''
+        url = reverse('ticket:ticket-list')
+        for _ in range(depth):
+            next_url = self.client.get(url).data['next']
+            if next_url is None:
+                break
+            url = next_url
+        return url
+
+    def get_requests(self):
+        '''Return `(name, callable)` pairs sending one request each.'''
+        ticket_list = reverse('ticket:ticket-list')
+        ticket = self.unpaid[0]
+
+        def pay():
+            ticket = self.unpaid.pop()
+            return self.client.post(
+                reverse('ticket:ticket-pay', args=[ticket.id])
+            )
+
+        return (
+            ('ticket-list', lambda: self.client.get(ticket_list)),
+            ('ticket-list-deep', lambda: self.client.get(self.deep_page)),
+            ('ticket-detail', lambda: self.client.get(
+                reverse('ticket:ticket-detail', args=[ticket.id])
+            )),
+            ('ticket-create', lambda: self.client.post(
+                ticket_list, {'event': self.event.id, 'price': '10.00'}
+            )),
+            ('ticket-pay', pay),
+            ('event-list', lambda: self.client.get(
+                reverse('ticket:event-list')
+            )),
+            ('event-search', lambda: self.client.get(
+                reverse('ticket:event-list'),
+                {'q': 'seeded event', 'upcoming': 'true'},
+            )),
+            ('user-me', lambda: self.client.get(reverse('user:me'))),
+            ('user-token', lambda: APIClient().post(
+                reverse('user:token'),
+                {'email': self.user.email, 'password': PASSWORD},
+            )),
+        )
+
+    def measure(self, request, warmup, iterations):
+        '''Time `iterations` calls of `request` after a warmup.'''
+        for _ in range(warmup):
+            request()
+
+        latencies, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = request()
+                latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f'{response.status_code}: {response.content[:200]}'
+                )
+            queries.append(len(context.captured_queries))
+
+        return summarize(latencies, queries)
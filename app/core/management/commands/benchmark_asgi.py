@@ -0,0 +1,141 @@
+'''
+Django command to compare WSGI and ASGI throughput with slow clients.
+'''
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test.utils import override_settings
+from django.urls import reverse
+
+
+from core.concurrency import StreamingASGIHandler
+from core.models import AuthToken, Event, Ticket
+
+HOST = 'benchmark.local'
+
+
+class Command(BaseCommand):
+    '''Django command to compare WSGI and ASGI requests/sec.'''
+    help = (
+        'Serve many concurrent slow clients through WSGI worker threads, '
+        'through ASGI with the sync views and through ASGI with the async '
+        'views, and report requests/sec for each.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='Worker threads of the simulated WSGI server.',
+        )
+        parser.add_argument(
+            '--client-delay', type=float, default=0.2,
+            help='Seconds each client takes to read its response.',
+        )
+        parser.add_argument('--tickets', type=int, default=20)
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        user = get_user_model().objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex}@example.com',
+        )
+        runs = (
+            ('wsgi, sync views', self.run_wsgi, 'ticket:ticket-list'),
+            ('asgi, sync views', self.run_asgi, 'ticket:ticket-list'),
+            ('asgi, async views', self.run_asgi, 'ticket:async-ticket-list'),
+        )
+        try:
+            self.key = AuthToken.objects.issue(user).key
+            event = Event.objects.create(
+                owner=user, name='Benchmark', description='Benchmark event',
+                started_at='2030-01-01T00:00:00Z', duration_hours=1,
+            )
+            Ticket.objects.bulk_create(
+                Ticket(owner=user, event=event, price=10)
+                for _ in range(options['tickets'])
+            )
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, HOST],
+            ):
+                for label, run, url_name in runs:
+                    elapsed = run(reverse(url_name), options)
+                    rate = options['requests'] / elapsed
+                    self.stdout.write(
+                        f'{label:<20} {rate:>10.1f} req/s '
+                        f'{elapsed:>8.2f} s total'
+                    )
+        finally:
+            user.delete()
+
+    def run_wsgi(self, path, options):
+        '''Return the seconds a thread pool takes to serve every client.'''
+        application = get_wsgi_application()
+
+        def serve(_):
+            environ = {
+                'PATH_INFO': path,
+                'HTTP_HOST': HOST,
+                'HTTP_AUTHORIZATION': f'Token {self.key}',
+            }
+            setup_testing_defaults(environ)
+            response = application(environ, lambda *args: None)
+            for _ in response:
+                # The worker is blocked until the client reads the body.
+                time.sleep(options['client_delay'])
+            response.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            list(pool.map(serve, range(options['requests'])))
+        return time.perf_counter() - start
+
+    def run_asgi(self, path, options):
+        '''Return the seconds the event loop takes to serve every client.'''
+        application = StreamingASGIHandler()
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (b'host', HOST.encode()),
+                (b'authorization', f'Token {self.key}'.encode()),
+            ],
+            'client': ('127.0.0.1', 50000),
+            'server': (HOST, 80),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                # A slow client only holds the connection, not a thread.
+                await asyncio.sleep(options['client_delay'])
+
+        async def client(limit):
+            async with limit:
+                await application(dict(scope), receive, send)
+
+        async def serve_all():
+            limit = asyncio.Semaphore(options['concurrency'])
+            await asyncio.gather(*(
+                client(limit) for _ in range(options['requests'])
+            ))
+
+        start = time.perf_counter()
+        asyncio.run(serve_all())
+        return time.perf_counter() - start
@@ -0,0 +1,83 @@
+'''
+Django command to benchmark database connection handling.
+'''
+import time
+import uuid
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+
+from core.authentication import token_cache
+from core.models import AuthToken
+
+MODES = (
+    ('new connection per request', {'CONN_MAX_AGE': 0, 'POOL': None}),
+    ('persistent connections', {'CONN_MAX_AGE': 60, 'POOL': None}),
+    ('connection pool', {
+        'CONN_MAX_AGE': 0,
+        'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 4},
+    }),
+)
+
+
+class Command(BaseCommand):
+    '''Django command to compare requests/sec per connection mode.'''
+    help = (
+        'Send requests through the WSGI application with new, persistent '
+        'and pooled database connections and report requests/sec.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--path', default='/api/ticket/ticket/')
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        application = get_wsgi_application()
+        connection = connections['default']
+        original = {
+            key: connection.settings_dict.get(key)
+            for key in ('CONN_MAX_AGE', 'POOL')
+        }
+        user = get_user_model().objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex}@example.com',
+        )
+        token = AuthToken.objects.issue(user)
+
+        try:
+            for label, overrides in MODES:
+                connection.close()
+                connection.settings_dict.update(overrides)
+                elapsed = self.run(
+                    application, options['path'], token.key,
+                    options['requests'],
+                )
+                rate = options['requests'] / elapsed
+                self.stdout.write(
+                    f'{label:<28} {rate:>10.1f} req/s '
+                    f'{elapsed / options["requests"] * 1000:>8.2f} ms/req'
+                )
+        finally:
+            connection.close()
+            connection.settings_dict.update(original)
+            connection.close_pools()
+            user.delete()
+
+    def run(self, application, path, key, count):
+        '''Return the seconds taken to serve `count` requests.'''
+        start = time.perf_counter()
+        for _ in range(count):
+            # Miss the token cache so every request needs the database.
+            token_cache.clear()
+            environ = {
+                'PATH_INFO': path,
+                'HTTP_AUTHORIZATION': f'Token {key}',
+            }
+            setup_testing_defaults(environ)
+            response = application(environ, lambda *args: None)
+            b''.join(response)
+            response.close()
+        return time.perf_counter() - start
@@ -0,0 +1,41 @@
+'''
+Django command to benchmark password checks per core for each hasher.
+'''
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+PASSWORD = 'benchmark-pass'
+
+
+class Command(BaseCommand):
+    '''Django command to report logins/sec per core for each hasher.'''
+    help = (
+        'Time password verification, the CPU-bound part of a login, with '
+        'every configured hasher on a single core.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20)
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        for hasher in get_hashers():
+            hasher_name = type(hasher).__name__
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as error:
+                self.stdout.write(f'{hasher_name:<32} skipped: {error}')
+                continue
+
+            start = time.perf_counter()
+            for _ in range(options['logins']):
+                hasher.verify(PASSWORD, encoded)
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f'{hasher_name:<32} {options["logins"] / elapsed:>8.1f} '
+                f'logins/s/core {elapsed / options["logins"] * 1000:>8.2f} '
+                f'ms/login'
+            )
@@ -0,0 +1,21 @@
+'''
+Django command to delete expired idempotency keys.
+'''
+from django.core.management.base import BaseCommand
+
+from core.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    '''Django command to delete expired idempotency keys.'''
+    help = 'Delete expired idempotency keys in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        deleted = IdempotencyKey.objects.purge_expired(
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(f'Deleted {deleted} expired idempotency keys.')
@@ -0,0 +1,21 @@
+'''
+Django command to delete expired auth tokens.
+'''
+from django.core.management.base import BaseCommand
+
+from core.models import AuthToken
+
+
+class Command(BaseCommand):
+    '''Django command to delete expired auth tokens.'''
+    help = 'Delete expired auth tokens in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        deleted = AuthToken.objects.purge_expired(
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(f'Deleted {deleted} expired tokens.')
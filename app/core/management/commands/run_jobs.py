@@ -0,0 +1,77 @@
+'''
+Django command to run background jobs.
+'''
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from core.models import Job
+
+
+class Command(BaseCommand):
+    '''Django command to run queued jobs with a pool of worker threads.'''
+    help = (
+        'Run queued background jobs. Several processes can run this command '
+        'at once; each job is claimed by exactly one worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Worker threads in this process.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds an idle worker waits before polling again.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once no jobs are due instead of polling.',
+        )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+
+        if options['workers'] == 1:
+            self.work(options['interval'], options['once'])
+        else:
+            signal.signal(signal.SIGTERM, lambda *args: self.stopping.set())
+            workers = [
+                threading.Thread(
+                    target=self.work,
+                    args=(options['interval'], options['once']),
+                )
+                for _ in range(options['workers'])
+            ]
+            for worker in workers:
+                worker.start()
+            try:
+                for worker in workers:
+                    worker.join()
+            except KeyboardInterrupt:
+                self.stopping.set()
+                for worker in workers:
+                    worker.join()
+
+        self.stdout.write(f'Ran {self.processed} jobs.')
+
+    def work(self, interval, once):
+        '''Run due jobs until stopped, waiting `interval` when idle.'''
+        try:
+            while not self.stopping.is_set():
+                if Job.objects.run_next():
+                    with self.lock:
+                        self.processed += 1
+                    continue
+                if once:
+                    return
+                close_old_connections()
+                self.stopping.wait(interval)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
@@ -0,0 +1,174 @@
+'''
+Middleware recording the database work done by each request.
+'''
+import asyncio
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('core.queries')
+
+# Label of requests that match no URL, so clients cannot add routes.
+UNMATCHED_ROUTE = '<unmatched>'
+
+_route_stats = {}
+_route_stats_lock = threading.Lock()
+
+# Stats of the request being handled, visible to worker threads of async
+# views through `core.concurrency.database_sync_to_async`.
+current_query_stats = contextvars.ContextVar(
+    'current_query_stats', default=None
+)
+
+
+def fingerprint(sql):
+    '''Return a short fingerprint of a parametrised SQL statement.'''
+    return hashlib.md5(sql.encode()).hexdigest()[:12]
+
+
+def get_route_label(request):
+    '''
+    Return `ViewSet.action` for viewsets, else the URL name. Requests that
+    match no URL share one label.
+    '''
+    match = request.resolver_match
+    if match is None:
+        return UNMATCHED_ROUTE
+    view_class = getattr(match.func, 'cls', None)
+    actions = getattr(match.func, 'actions', None)
+    if view_class is not None and actions:
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{view_class.__name__}.{action}'
+    if view_class is not None:
+        return view_class.__name__
+    return match.view_name
+
+
+class QueryStats:
+    '''Queries executed while handling one request.'''
+
+    def __init__(self):
+        self.label = None
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        '''Record a query; used as a database execute wrapper.'''
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            key = fingerprint(sql)
+            self.fingerprints[key] += 1
+            self.statements.setdefault(key, sql)
+
+    @property
+    def duplicates(self):
+        '''Return `{sql: count}` for statements run more than once.'''
+        return {
+            self.statements[key]: count
+            for key, count in self.fingerprints.items()
+            if count > 1
+        }
+
+    def server_timing(self):
+        '''Return the value of a `Server-Timing` header.'''
+        return (
+            f'db;dur={self.duration * 1000:.2f};'
+            f'desc="{self.count} queries, '
+            f'{len(self.duplicates)} duplicated"'
+        )
+
+
+def record_route(stats):
+    '''Fold a request's stats into the per-route aggregates.'''
+    with _route_stats_lock:
+        route = _route_stats.setdefault(stats.label, {
+            'requests': 0,
+            'queries': 0,
+            'max_queries': 0,
+            'sql_ms': 0.0,
+            'duplicated_requests': 0,
+        })
+        route['requests'] += 1
+        route['queries'] += stats.count
+        route['max_queries'] = max(route['max_queries'], stats.count)
+        route['sql_ms'] += stats.duration * 1000
+        route['duplicated_requests'] += bool(stats.duplicates)
+
+
+def get_route_stats():
+    '''Return a copy of the per-route aggregates of this process.'''
+    with _route_stats_lock:
+        return {label: dict(route) for label, route in _route_stats.items()}
+
+
+def reset_route_stats():
+    '''Forget the per-route aggregates.'''
+    with _route_stats_lock:
+        _route_stats.clear()
+
+
+class QueryCountMiddleware:
+    '''
+    Count queries, SQL time and repeated statements per request.
+
+    Stats are attached to the request as `request.query_stats` and folded
+    into per-route aggregates. With `DEBUG` on they are also exposed in
+    `Server-Timing` and `X-Query-Count` response headers.
+    '''
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Let Django await us instead of running the chain in a thread.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        stats = self.start(request)
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = self.start(request)
+        response = await self.get_response(request)
+        return self.finish(request, response, stats)
+
+    def start(self, request):
+        '''Attach fresh stats to the request.'''
+        stats = QueryStats()
+        request.query_stats = stats
+        current_query_stats.set(stats)
+        return stats
+
+    def finish(self, request, response, stats):
+        '''Record the stats and expose them on the response.'''
+        stats.label = get_route_label(request)
+        record_route(stats)
+        if stats.duplicates:
+            logger.debug(
+                '%s ran %d queries, duplicated: %s',
+                stats.label, stats.count, stats.duplicates,
+            )
+
+        if settings.DEBUG:
+            response['Server-Timing'] = stats.server_timing()
+            response['X-Query-Count'] = str(stats.count)
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:23
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_alter_ticket_event'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(fields=['started_at', 'id'], name='event_started_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='ticket_owner_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['event', 'paid'], name='ticket_event_paid_idx'),
+        ),
+    ]
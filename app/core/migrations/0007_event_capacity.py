@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:25
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='sold',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            '''
+            UPDATE core_event SET sold = (
+                SELECT COUNT(*) FROM core_ticket
+                WHERE core_ticket.event_id = core_event.id
+            )
+            ''',
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.CheckConstraint(check=models.Q(('capacity__isnull', True), ('sold__lte', django.db.models.expressions.F('capacity')), _connector='OR'), name='event_sold_within_capacity'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_event_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='paid_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='revenue',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunSQL(
+            '''
+            UPDATE core_event SET
+                paid_count = stats.paid_count,
+                revenue = stats.revenue
+            FROM (
+                SELECT event_id, COUNT(*) AS paid_count, SUM(price) AS revenue
+                FROM core_ticket
+                WHERE paid
+                GROUP BY event_id
+            ) AS stats
+            WHERE stats.event_id = core_event.id
+            ''',
+            migrations.RunSQL.noop,
+        ),
+    ]
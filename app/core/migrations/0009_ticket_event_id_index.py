@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:29
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_event_sales_counters'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['event', 'id'], name='ticket_event_id_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_ticket_event_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveSmallIntegerField(default=1)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('expires_at', models.DateTimeField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.event')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='hold',
+            index=models.Index(fields=['expires_at'], name='hold_expires_at_idx'),
+        ),
+        # Holds are inserted and deleted constantly: leave room for HOT
+        # updates and vacuum the small table aggressively.
+        migrations.RunSQL(
+            'ALTER TABLE core_hold SET (fillfactor = 80, '
+            'autovacuum_vacuum_scale_factor = 0.01)',
+            'ALTER TABLE core_hold RESET (fillfactor, '
+            'autovacuum_vacuum_scale_factor)',
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:46
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+TRIGRAM_INDEX = (
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS event_name_trgm_idx '
+    'ON core_event USING gin (name gin_trgm_ops)'
+)
+
+
+def add_trigram_index(apps, schema_editor):
+    '''Index event names for similarity search where pg_trgm exists.'''
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        cursor.execute(TRIGRAM_INDEX)
+
+
+def remove_trigram_index(apps, schema_editor):
+    schema_editor.execute(
+        'DROP INDEX CONCURRENTLY IF EXISTS event_name_trgm_idx'
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0010_hold'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', 'description', config='english'), name='event_search_idx'),
+        ),
+        migrations.RunPython(add_trigram_index, remove_trigram_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:58
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def copy_tokens(apps, schema_editor):
+    '''Carry existing tokens over, valid for a full TTL from now.'''
+    Token = apps.get_model('authtoken', 'Token')
+    AuthToken = apps.get_model('core', 'AuthToken')
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.TOKEN_TTL)
+    AuthToken.objects.bulk_create(
+        (
+            AuthToken(
+                key=token.key,
+                user_id=token.user_id,
+                created=token.created,
+                last_used=now,
+                expires_at=expires_at,
+            )
+            for token in Token.objects.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_event_search'),
+        ('authtoken', '0003_tokenproxy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_used', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='authtoken',
+            index=models.Index(fields=['expires_at'], name='authtoken_expires_at_idx'),
+        ),
+        migrations.RunPython(copy_tokens, migrations.RunPython.noop),
+    ]
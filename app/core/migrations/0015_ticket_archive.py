@@ -0,0 +1,62 @@
+# Generated by Django 3.2.25 on 2026-10-17 22:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+TICKET_COLUMNS = (
+    'id, created_at, updated_at, event_id, owner_id, price, paid, paid_at'
+)
+
+CREATE_HISTORY_VIEW = (
+    f'CREATE VIEW core_tickethistory AS '
+    f'SELECT {TICKET_COLUMNS} FROM core_ticket '
+    f'UNION ALL '
+    f'SELECT {TICKET_COLUMNS} FROM core_archivedticket'
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketHistory',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('paid', models.BooleanField(default=False)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('paid', models.BooleanField(default=False)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.event')),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedticket',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='archived_owner_created_idx'),
+        ),
+        migrations.RunSQL(
+            CREATE_HISTORY_VIEW,
+            'DROP VIEW core_tickethistory',
+        ),
+    ]
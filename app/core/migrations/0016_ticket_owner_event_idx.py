@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-17 22:13
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0015_ticket_archive'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['owner', 'event'], name='ticket_owner_event_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-17 22:44
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_ticket_owner_event_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='archivedticket',
+            index=models.Index(fields=['event', 'id'], name='archived_event_id_idx'),
+        ),
+        migrations.AlterField(
+            model_name='archivedticket',
+            name='event',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.event'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-17 22:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# AlterField would also drop and re-add the foreign key constraints, which
+# revalidates every ticket; only the redundant indexes are dropped here.
+FK_INDEXES = (
+    ('core_ticket_event_id_67547b17', 'event_id'),
+    ('core_ticket_owner_id_d321d4d1', 'owner_id'),
+)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0017_archivedticket_event_id_idx'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"',
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+                    f'ON "core_ticket" ("{column}")',
+                )
+                for name, column in FK_INDEXES
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='ticket',
+                    name='event',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.event'),
+                ),
+                migrations.AlterField(
+                    model_name='ticket',
+                    name='owner',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+    ]
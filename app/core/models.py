@@ -1,16 +1,29 @@
 '''
 Database models.
 '''
+import logging
+import random
+import secrets
+import traceback
+from collections import defaultdict
+from datetime import timedelta
+
 from django.utils import timezone
+from django.utils.module_loading import import_string
 
 from django.conf import settings
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import connection, models, transaction
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin
 )
 
+logger = logging.getLogger('core.jobs')
+
 
 class UserManager(BaseUserManager):
     '''Manager for user profiles.'''
@@ -47,6 +60,114 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
+class ExpiringManager(models.Manager):
+    '''Manager for rows that expire at their `expires_at`.'''
+
+    def purge_expired(self, batch_size=1000, now=None):
+        '''
+        Delete expired rows one batch at a time and return how many were
+        deleted. Expired rows are ignored by their readers, so they are
+        deleted directly without loading them.
+        '''
+        now = now or timezone.now()
+        table = self.model._meta.db_table
+        pk = self.model._meta.pk.column
+        deleted = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE {pk} IN ('
+                    f'SELECT {pk} FROM {table} WHERE expires_at <= %s '
+                    f'LIMIT %s)',
+                    [now, batch_size],
+                )
+                count = cursor.rowcount
+            deleted += count
+            if count < batch_size:
+                return deleted
+
+
+class AuthTokenManager(ExpiringManager):
+    '''Manager for expiring auth tokens.'''
+
+    def issue(self, user):
+        '''Create a new token for `user` valid for `TOKEN_TTL` seconds.'''
+        now = timezone.now()
+        return self.create(
+            key=secrets.token_hex(20),
+            user=user,
+            last_used=now,
+            expires_at=now + timedelta(seconds=settings.TOKEN_TTL),
+        )
+
+
+class AuthToken(models.Model):
+    '''
+    Expiring API token.
+
+    Tokens expire `TOKEN_TTL` seconds after they were last used. Use is
+    recorded at most once per `TOKEN_TOUCH_INTERVAL`, not on every request.
+    '''
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='auth_tokens',
+        on_delete=models.CASCADE,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    last_used = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    objects = AuthTokenManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['expires_at'],
+                name='authtoken_expires_at_idx',
+            ),
+        ]
+
+    def __str__(self):
+        '''Return string representation of the token.'''
+        return self.key
+
+    @property
+    def expired(self):
+        '''Return whether the token has expired.'''
+        return self.expires_at <= timezone.now()
+
+    def needs_touch(self, now=None):
+        '''Return whether the last use is due to be recorded.'''
+        now = now or timezone.now()
+        interval = timedelta(seconds=settings.TOKEN_TOUCH_INTERVAL)
+        return self.last_used + interval <= now
+
+    def touch(self, now=None):
+        '''
+        Record a use and extend the expiry, unless another request already
+        did within the interval. Return whether a row was written.
+        '''
+        now = now or timezone.now()
+        interval = timedelta(seconds=settings.TOKEN_TOUCH_INTERVAL)
+        expires_at = now + timedelta(seconds=settings.TOKEN_TTL)
+        touched = AuthToken.objects.filter(
+            pk=self.pk,
+            last_used__lte=now - interval,
+        ).update(last_used=now, expires_at=expires_at)
+        self.last_used = now
+        self.expires_at = expires_at
+        return bool(touched)
+
+
+class SoldOut(Exception):
+    '''Raised when an event has no seats left.'''
+
+
+class HoldExpired(Exception):
+    '''Raised when paying for a hold that has expired.'''
+
+
 class Event(models.Model):
     '''Event model.'''
     created_at = models.DateTimeField(auto_now_add=True)
@@ -60,35 +181,617 @@ class Event(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    sold = models.PositiveIntegerField(default=0, editable=False)
+    paid_count = models.PositiveIntegerField(default=0, editable=False)
+    revenue = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['started_at', 'id'],
+                name='event_started_at_idx',
+            ),
+            GinIndex(
+                SearchVector('name', 'description', config='english'),
+                name='event_search_idx',
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    models.Q(capacity__isnull=True) |
+                    models.Q(sold__lte=models.F('capacity'))
+                ),
+                name='event_sold_within_capacity',
+            ),
+        ]
 
     def __str__(self):
         '''Return string representation of the event.'''
         return self.name
 
+    def reserve_seats(self, quantity=1):
+        '''Atomically take `quantity` seats, raising `SoldOut` if full.'''
+        has_room = (
+            models.Q(capacity__isnull=True) |
+            models.Q(capacity__gte=models.F('sold') + quantity)
+        )
+        reserved = Event.objects.filter(has_room, pk=self.pk).update(
+            sold=models.F('sold') + quantity,
+            updated_at=timezone.now(),
+        )
+        if not reserved:
+            raise SoldOut(f'Event {self.pk} has no seats left.')
+
+    def release_seats(self, quantity=1):
+        '''Give `quantity` seats back to the event.'''
+        Event.objects.filter(pk=self.pk, sold__gte=quantity).update(
+            sold=models.F('sold') - quantity,
+            updated_at=timezone.now(),
+        )
+
+    def record_payments(self, count, amount):
+        '''Add `count` paid tickets worth `amount` to the sales counters.'''
+        Event.objects.filter(pk=self.pk).update(
+            paid_count=models.F('paid_count') + count,
+            revenue=models.F('revenue') + amount,
+            updated_at=timezone.now(),
+        )
+
+    def schedule_payments(self, count, amount):
+        '''
+        Queue a change of the sales counters, to be applied by a job
+        worker. Every counter change goes through the queue, so a refund
+        is queued after the payment it reverses; should a parallel worker
+        run it first, the counter check fails and the job is retried.
+        '''
+        Job.objects.enqueue(
+            'core.tasks.record_payments',
+            event_id=self.pk,
+            count=count,
+            amount=str(amount),
+        )
+
+
+class TicketManager(models.Manager):
+    '''Manager for tickets.'''
+
+    def archive_past(self, batch_size=1000, now=None):
+        '''
+        Move tickets of events that ended before `now` to the archive, one
+        batch at a time, and return how many were moved. Each batch is a
+        single `DELETE ... RETURNING` feeding an `INSERT`; tickets locked
+        by a concurrent request are left for the next run.
+        '''
+        now = now or timezone.now()
+        ticket_table = self.model._meta.db_table
+        event_table = Event._meta.db_table
+        archive_table = ArchivedTicket._meta.db_table
+        columns = (
+            'id, created_at, updated_at, event_id, owner_id, price, paid, '
+            'paid_at'
+        )
+        archived = 0
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'WITH moved AS ('
+                    f'  DELETE FROM {ticket_table} WHERE id IN ('
+                    f'    SELECT ticket.id FROM {ticket_table} ticket'
+                    f'    JOIN {event_table} event'
+                    f'      ON event.id = ticket.event_id'
+                    f'    WHERE event.started_at < %(now)s'
+                    f'      AND event.started_at + event.duration_hours'
+                    f"        * interval '1 hour' < %(now)s"
+                    f'    ORDER BY ticket.id'
+                    f'    LIMIT %(batch_size)s'
+                    f'    FOR UPDATE OF ticket SKIP LOCKED'
+                    f'  ) RETURNING {columns}'
+                    f') '
+                    f'INSERT INTO {archive_table} ({columns}, archived_at) '
+                    f'SELECT {columns}, %(now)s FROM moved',
+                    {'now': now, 'batch_size': batch_size},
+                )
+                count = cursor.rowcount
+            archived += count
+            if count < batch_size:
+                return archived
+
+    def purchase(self, event, owner, **fields):
+        '''Create a ticket, reserving its seat in the same transaction.'''
+        with transaction.atomic():
+            ticket = self.create(event=event, owner=owner, **fields)
+            event.reserve_seats()
+            if ticket.paid:
+                event.schedule_payments(1, ticket.price)
+
+        return ticket
+
+    def purchase_many(self, owner, items, atomic=True):
+        '''
+        Buy a batch of tickets with one seat update per event and a single
+        INSERT. `items` are dicts of ticket fields with `event` set to an
+        `Event`. Returns, per item, the created `Ticket`, a `SoldOut` error
+        or `None` when an atomic batch was rolled back.
+        '''
+        results = [None] * len(items)
+        by_event = defaultdict(list)
+        for index, item in enumerate(items):
+            by_event[item['event'].pk].append(index)
+
+        granted = []
+        with transaction.atomic():
+            # Lock events in a stable order so batches cannot deadlock.
+            for event_id in sorted(by_event):
+                indexes = by_event[event_id]
+                event = items[indexes[0]]['event']
+                try:
+                    event.reserve_seats(len(indexes))
+                    granted.extend(indexes)
+                    continue
+                except SoldOut as error:
+                    if atomic:
+                        for index in indexes:
+                            results[index] = error
+                        continue
+
+                for position, index in enumerate(indexes):
+                    try:
+                        event.reserve_seats()
+                    except SoldOut as error:
+                        for rejected in indexes[position:]:
+                            results[rejected] = error
+                        break
+                    granted.append(index)
+
+            if atomic and any(results):
+                transaction.set_rollback(True)
+                return results
+
+            granted.sort()
+            tickets = self.bulk_create(
+                self.model(owner=owner, **items[index]) for index in granted
+            )
+            for index, ticket in zip(granted, tickets):
+                results[index] = ticket
+
+        return results
+
 
 class Ticket(models.Model):
     '''Ticket model.'''
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # The composite indexes below lead with `event` and `owner` and cover
+    # lookups by either, so the foreign keys get no indexes of their own.
     event = models.ForeignKey(
         Event,
         on_delete=models.CASCADE,
+        db_index=False,
     )
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     price = models.DecimalField(max_digits=5, decimal_places=2)
     paid = models.BooleanField(default=False)
     paid_at = models.DateTimeField(null=True, blank=True)
 
+    objects = TicketManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['owner', '-created_at', '-id'],
+                name='ticket_owner_created_idx',
+            ),
+            models.Index(
+                fields=['event', 'paid'],
+                name='ticket_event_paid_idx',
+            ),
+            models.Index(
+                fields=['event', 'id'],
+                name='ticket_event_id_idx',
+            ),
+            models.Index(
+                fields=['owner', 'event'],
+                name='ticket_owner_event_idx',
+            ),
+        ]
+
     def __str__(self):
         '''Return string representation of the ticket.'''
         return self.event.name
 
     def pay(self):
-        '''Pay for the ticket.'''
-        self.paid = True
-        self.paid_at = timezone.now()
-        self.save()
+        '''
+        Pay for the ticket, returning `False` if it was already paid. The
+        event's payment counters are updated by a background job, keeping
+        the hot event row out of the request.
+        '''
+        now = timezone.now()
+        with transaction.atomic():
+            paid = Ticket.objects.filter(pk=self.pk, paid=False).update(
+                paid=True,
+                paid_at=now,
+                updated_at=now,
+            )
+            if paid:
+                Event(pk=self.event_id).schedule_payments(1, self.price)
+
+        if paid:
+            self.paid = True
+            self.paid_at = now
+            self.updated_at = now
+
+        return bool(paid)
+
+
+class ArchivedTicket(models.Model):
+    '''
+    Ticket for an event that has ended, moved out of the tickets table.
+
+    Rows keep the id they had as a `Ticket` and are only read through
+    `TicketHistory`.
+    '''
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # `archived_event_id_idx` covers lookups by event.
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    # `archived_owner_created_idx` covers lookups by owner.
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    price = models.DecimalField(max_digits=5, decimal_places=2)
+    paid = models.BooleanField(default=False)
+    paid_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['owner', '-created_at', '-id'],
+                name='archived_owner_created_idx',
+            ),
+            models.Index(
+                fields=['event', 'id'],
+                name='archived_event_id_idx',
+            ),
+        ]
+
+    def __str__(self):
+        '''Return string representation of the archived ticket.'''
+        return self.event.name
+
+
+class TicketHistory(models.Model):
+    '''
+    Read-only view of current and archived tickets.
+
+    The `core_tickethistory` view is a `UNION ALL` of both tables, so
+    filters and `ORDER BY ... LIMIT` are pushed down to the indexes of
+    each.
+    '''
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+    )
+    price = models.DecimalField(max_digits=5, decimal_places=2)
+    paid = models.BooleanField(default=False)
+    paid_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+
+    def __str__(self):
+        '''Return string representation of the ticket.'''
+        return self.event.name
+
+
+class HoldManager(models.Manager):
+    '''Manager for seat holds.'''
+
+    def hold(self, event, owner, quantity=1, ttl=None, **fields):
+        '''Take `quantity` seats for `ttl` seconds, raising `SoldOut`.'''
+        if ttl is None:
+            ttl = settings.HOLD_TTL
+        expires_at = timezone.now() + timedelta(seconds=ttl)
+        with transaction.atomic():
+            event.reserve_seats(quantity)
+            return self.create(
+                event=event,
+                owner=owner,
+                quantity=quantity,
+                expires_at=expires_at,
+                **fields,
+            )
+
+    def active(self):
+        '''Return holds that have not expired yet.'''
+        return self.filter(expires_at__gt=timezone.now())
+
+    def release_expired(self, batch_size=1000, now=None):
+        '''
+        Delete expired holds one batch at a time, giving their seats back,
+        and return how many were released. Rows locked by a concurrent
+        payment or sweep are skipped.
+        '''
+        now = now or timezone.now()
+        released = 0
+        while True:
+            with transaction.atomic():
+                expired = list(
+                    self.filter(expires_at__lte=now)
+                    .select_for_update(skip_locked=True)
+                    .order_by('expires_at')
+                    .values_list('id', 'event_id', 'quantity')[:batch_size]
+                )
+                if not expired:
+                    return released
+
+                seats = defaultdict(int)
+                for _, event_id, quantity in expired:
+                    seats[event_id] += quantity
+                self.filter(pk__in=[row[0] for row in expired]).delete()
+                for event_id in sorted(seats):
+                    Event(pk=event_id).release_seats(seats[event_id])
+
+            released += len(expired)
+
+
+class Hold(models.Model):
+    '''
+    Seats set aside for a user while they pay.
+
+    Holds live outside the tickets table so abandoned carts never touch
+    its indexes: paying converts a hold into paid `Ticket` rows, and
+    expired holds are swept in batches by `release_expired`.
+    '''
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    quantity = models.PositiveSmallIntegerField(default=1)
+    price = models.DecimalField(max_digits=5, decimal_places=2)
+    expires_at = models.DateTimeField()
+
+    objects = HoldManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='hold_expires_at_idx'),
+        ]
+
+    def __str__(self):
+        '''Return string representation of the hold.'''
+        return f'{self.quantity} x {self.event_id}'
+
+    @property
+    def expired(self):
+        '''Return whether the hold has expired.'''
+        return self.expires_at <= timezone.now()
+
+    def pay(self):
+        '''
+        Turn the hold into paid tickets and return them. The seats were
+        taken when the hold was made, so only the payment counters change,
+        which is left to a background job. Raises `HoldExpired` if the hold
+        expired or was already used.
+        '''
+        now = timezone.now()
+        with transaction.atomic():
+            deleted, _ = Hold.objects.filter(
+                pk=self.pk, expires_at__gt=now,
+            ).delete()
+            if not deleted:
+                raise HoldExpired(f'Hold {self.pk} has expired.')
+
+            tickets = Ticket.objects.bulk_create(
+                Ticket(
+                    event_id=self.event_id,
+                    owner_id=self.owner_id,
+                    price=self.price,
+                    paid=True,
+                    paid_at=now,
+                )
+                for _ in range(self.quantity)
+            )
+            Event(pk=self.event_id).schedule_payments(
+                self.quantity, self.price * self.quantity,
+            )
+
+        return tickets
+
+    def release(self):
+        '''Cancel the hold and give its seats back if it was still held.'''
+        with transaction.atomic():
+            deleted, _ = Hold.objects.filter(pk=self.pk).delete()
+            if deleted:
+                Event(pk=self.event_id).release_seats(self.quantity)
+
+        return bool(deleted)
+
+
+class JobManager(models.Manager):
+    '''Manager for background jobs.'''
+
+    def enqueue(self, task, run_at=None, **kwargs):
+        '''
+        Queue `task` (a function or its dotted path) to be called with
+        `kwargs`. The job is only visible to workers once the surrounding
+        transaction commits, and is dropped if it rolls back.
+        '''
+        if callable(task):
+            task = f'{task.__module__}.{task.__qualname__}'
+        return self.create(
+            task=task,
+            kwargs=kwargs,
+            run_at=run_at or timezone.now(),
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+
+    def pending(self):
+        '''Return jobs that have not failed for good.'''
+        return self.filter(failed_at__isnull=True)
+
+    def run_next(self, now=None):
+        '''
+        Claim and run the next due job, returning whether there was one.
+
+        The job's row stays locked while it runs, so concurrent workers
+        skip it, and a crashed worker's job becomes due again as soon as
+        its connection drops.
+        '''
+        with transaction.atomic():
+            job = (
+                self.pending()
+                .filter(run_at__lte=now or timezone.now())
+                .order_by('run_at', 'id')
+                .select_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                return False
+            job.run()
+        return True
+
+    def run_pending(self):
+        '''Run due jobs until there are none left and return how many.'''
+        count = 0
+        while self.run_next():
+            count += 1
+        return count
+
+
+class Job(models.Model):
+    '''
+    Background job stored in Postgres.
+
+    Workers claim due jobs with `SELECT ... FOR UPDATE SKIP LOCKED`. A
+    job that raises is retried with exponential backoff until it has
+    been tried `max_attempts` times; successful jobs are deleted.
+    '''
+    task = models.CharField(max_length=255)
+    kwargs = models.JSONField(default=dict)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    last_error = models.TextField(blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = JobManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['run_at', 'id'],
+                condition=models.Q(failed_at__isnull=True),
+                name='job_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        '''Return string representation of the job.'''
+        return f'{self.task} #{self.pk}'
+
+    def get_retry_delay(self):
+        '''Return the seconds to wait before the next attempt.'''
+        delay = settings.JOB_RETRY_DELAY * 2 ** (self.attempts - 1)
+        delay = min(delay, settings.JOB_RETRY_DELAY_MAX)
+        # Jitter keeps jobs that failed together from retrying together.
+        return delay * random.uniform(0.5, 1)
+
+    def run(self):
+        '''
+        Call the task. Its writes are rolled back if it raises, and the
+        job is then rescheduled or marked failed.
+        '''
+        try:
+            with transaction.atomic():
+                import_string(self.task)(**self.kwargs)
+        except Exception:
+            logger.exception('Job %s failed.', self)
+            self.retry(traceback.format_exc())
+        else:
+            self.delete()
+
+    def retry(self, error):
+        '''Record a failed attempt and schedule the next one, if any.'''
+        now = timezone.now()
+        self.attempts += 1
+        self.last_error = error
+        if self.attempts >= self.max_attempts:
+            self.failed_at = now
+        else:
+            self.run_at = now + timedelta(seconds=self.get_retry_delay())
+        self.save(update_fields=[
+            'attempts', 'last_error', 'failed_at', 'run_at',
+        ])
+
+
+class IdempotencyKey(models.Model):
+    '''
+    Response of a request made with an `Idempotency-Key` header.
+
+    Keys are unique per user and kept for `IDEMPOTENCY_KEY_TTL` seconds;
+    a retry with the same key and request replays the stored response.
+    '''
+    # The unique (user, key) index covers lookups by user.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField()
+
+    objects = ExpiringManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'key'],
+                name='idempotency_key_user_key_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['expires_at'],
+                name='idempotency_expires_at_idx',
+            ),
+        ]
+
+    def __str__(self):
+        '''Return string representation of the idempotency key.'''
+        return self.key
@@ -0,0 +1,29 @@
+'''
+Signal handlers for the core models.
+'''
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.authentication import token_cache
+from core.models import AuthToken
+
+
+@receiver(post_delete, sender=AuthToken)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    '''Forget a token as soon as it is deleted.'''
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    '''Forget cached tokens of a user whose profile changed.'''
+    if created:
+        return
+
+    keys = ()
+    if token_cache.shared_cache is not None:
+        keys = AuthToken.objects.filter(user=instance).values_list(
+            'key', flat=True
+        )
+    token_cache.invalidate_user(instance.pk, keys)
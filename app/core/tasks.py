@@ -0,0 +1,11 @@
+'''
+Background tasks run by the job workers.
+'''
+from decimal import Decimal
+
+from core.models import Event
+
+
+def record_payments(event_id, count, amount):
+    '''Add paid tickets to an event's sales counters.'''
+    Event(pk=event_id).record_payments(count, Decimal(amount))
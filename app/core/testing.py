@@ -0,0 +1,25 @@
+'''
+Test helpers shared by the app test suites.
+'''
+
+
+class QueryBudgetMixin:
+    '''
+    TestCase mixin checking requests against per-action query budgets.
+
+    Declare budgets as `{'TicketViewSet.list': 2}`; labels are the ones
+    `core.middleware.QueryCountMiddleware` gives each request.
+    '''
+    query_budgets = {}
+
+    def assertWithinQueryBudget(self, response):
+        '''Fail if the request behind `response` ran too many queries.'''
+        stats = response.wsgi_request.query_stats
+        budget = self.query_budgets.get(stats.label)
+        if budget is None:
+            self.fail(f'No query budget declared for {stats.label}.')
+        if stats.count > budget:
+            self.fail(
+                f'{stats.label} ran {stats.count} queries, budget is '
+                f'{budget}. Duplicated: {stats.duplicates}'
+            )
@@ -1,10 +1,17 @@
 '''
 Test for Django admin
 '''
-from django.test import TestCase
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.test import Client
+from django.utils import timezone
+
+from core import models
+from core.admin import EstimatedCountPaginator
 
 
 class AdminSiteTests(TestCase):
@@ -46,3 +53,62 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def create_tickets(self, count):
+        '''Create `count` tickets, each for its own event.'''
+        for index in range(count):
+            event = models.Event.objects.create(
+                owner=self.user,
+                name=f'Event {index}',
+                description='Test description',
+                started_at=timezone.now(),
+                duration_hours=5,
+            )
+            models.Ticket.objects.create(
+                owner=self.user,
+                event=event,
+                price=Decimal('5.00'),
+            )
+
+    def changelist_queries(self, url):
+        '''Return the number of queries run to render a changelist.'''
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return res.wsgi_request.query_stats.count
+
+    def test_ticket_changelist_constant_queries(self):
+        '''Test ticket rows do not each query their event.'''
+        url = reverse('admin:core_ticket_changelist')
+        self.create_tickets(2)
+        few = self.changelist_queries(url)
+
+        self.create_tickets(8)
+        many = self.changelist_queries(url)
+
+        self.assertEqual(few, many)
+
+    def test_event_changelist(self):
+        '''Test events are listed on the event page.'''
+        self.create_tickets(1)
+        url = reverse('admin:core_event_changelist')
+        res = self.client.get(url)
+
+        self.assertContains(res, 'Event 0')
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_paginator_uses_estimate_for_large_tables(self):
+        '''Test large tables are counted from the planner estimate.'''
+        queryset = models.Ticket.objects.order_by('-id')
+
+        with patch.object(EstimatedCountPaginator, 'estimate') as estimate:
+            estimate.return_value = 5000
+            self.assertEqual(EstimatedCountPaginator(queryset, 10).count, 5000)
+
+            estimate.return_value = 10
+            self.assertEqual(EstimatedCountPaginator(queryset, 10).count, 0)
+
+    def test_paginator_estimate(self):
+        '''Test the estimate is read from the query plan.'''
+        paginator = EstimatedCountPaginator(models.Ticket.objects.all(), 10)
+
+        self.assertIsInstance(paginator.estimate(), int)
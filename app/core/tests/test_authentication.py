@@ -0,0 +1,155 @@
+'''
+Tests for the cached token authentication.
+'''
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.authentication import (
+    CachedTokenAuthentication,
+    TokenCache,
+    token_cache,
+)
+from core.models import AuthToken
+
+ME_URL = reverse('user:me')
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def authenticate(key):
+    '''Authenticate a request carrying `key`.'''
+    request = APIRequestFactory().get(
+        '/', HTTP_AUTHORIZATION=f'Token {key}'
+    )
+    return CachedTokenAuthentication().authenticate(request)
+
+
+class TokenCacheTests(TestCase):
+    '''Test the in-process token cache.'''
+
+    def setUp(self):
+        self.user = create_user(email='user@example.com', password='pass')
+        self.token = AuthToken.objects.issue(self.user)
+
+    def test_lru_eviction(self):
+        '''Test the least recently used entry is evicted first.'''
+        cache = TokenCache(max_size=2)
+        for key in ('a', 'b'):
+            cache.set(key, (self.user, self.token))
+        cache.get('a')
+        cache.set('c', (self.user, self.token))
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    @patch('core.authentication.time.monotonic')
+    def test_ttl_expiry(self, patched_monotonic):
+        '''Test entries expire after the TTL.'''
+        cache = TokenCache(ttl=10)
+        patched_monotonic.return_value = 100
+        cache.set('a', (self.user, self.token))
+
+        patched_monotonic.return_value = 109
+        self.assertIsNotNone(cache.get('a'))
+        patched_monotonic.return_value = 111
+        self.assertIsNone(cache.get('a'))
+
+    def test_shared_tier(self):
+        '''Test entries written by one process are read by another.'''
+        writer = TokenCache(shared_cache='default')
+        reader = TokenCache(shared_cache='default')
+        writer.set('a', (self.user, self.token))
+
+        user, token = reader.get('a')
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_shared_invalidation_reaches_other_processes(self):
+        '''Test a token revoked in one process is rejected by another.'''
+        writer = TokenCache(shared_cache='default')
+        reader = TokenCache(shared_cache='default')
+        writer.set('a', (self.user, self.token))
+        writer.set('b', (self.user, self.token))
+        self.assertIsNotNone(reader.get('a'))
+        self.assertIsNotNone(reader.get('b'))
+
+        writer.invalidate('a')
+        writer.invalidate_user(self.user.pk, ['b'])
+
+        self.assertIsNone(reader.get('a'))
+        self.assertIsNone(reader.get('b'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    '''Test authenticating with the cached token backend.'''
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = create_user(email='user@example.com', password='pass')
+        self.token = AuthToken.objects.issue(self.user)
+
+    def test_cache_hit_skips_database(self):
+        '''Test a second request is authenticated without queries.'''
+        authenticate(self.token.key)
+
+        with self.assertNumQueries(0):
+            user, token = authenticate(self.token.key)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_deleted_token_invalidated(self):
+        '''Test deleting a token rejects it immediately.'''
+        authenticate(self.token.key)
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(self.token.key)
+
+    def test_deactivated_user_invalidated(self):
+        '''Test deactivating a user rejects their token immediately.'''
+        authenticate(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(self.token.key)
+
+    def test_rotated_token_revoked_in_other_processes(self):
+        '''Test rotation revokes the old token for every worker.'''
+        shared = TokenCache(shared_cache='default')
+        other_process = TokenCache(shared_cache='default')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        with patch.object(CachedTokenAuthentication, 'cache', shared), \
+                patch('core.signals.token_cache', shared):
+            client.get(ME_URL)
+            self.assertIsNotNone(other_process.get(self.token.key))
+            client.post(reverse('user:token-rotate'))
+
+        self.assertIsNone(other_process.get(self.token.key))
+
+    def test_profile_update_refreshes_user(self):
+        '''Test changes through the me endpoint are not served stale.'''
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        client.get(ME_URL)
+
+        client.patch(ME_URL, {'name': 'New name'})
+        res = client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'New name')
@@ -1,13 +1,18 @@
 '''
 Test custom Django management commands.
 '''
+import json
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg20pError
 
 from django.core.management import call_command
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -32,3 +37,64 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+class BenchmarkConnectionsTests(TransactionTestCase):
+    '''Test the connection benchmark command.'''
+
+    def test_reports_each_mode(self):
+        '''Test a rate is reported for every connection mode.'''
+        out = StringIO()
+
+        call_command('benchmark_connections', requests=3, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            self.assertIn('req/s', line)
+
+
+@patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 0})
+class BenchmarkAsgiTests(TransactionTestCase):
+    '''Test the WSGI/ASGI benchmark command.'''
+
+    def test_reports_each_server(self):
+        '''Test a rate is reported for every server setup.'''
+        out = StringIO()
+
+        call_command(
+            'benchmark_asgi', requests=4, concurrency=2, workers=2,
+            client_delay=0, stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            self.assertIn('req/s', line)
+
+
+@patch.object(connection.creation, 'destroy_test_db')
+@patch.object(connection.creation, 'create_test_db')
+class BenchmarkApiTests(TestCase):
+    '''Test the API benchmark command.'''
+
+    def test_writes_report(self, patched_create, patched_destroy):
+        '''Test a JSON report is written for every endpoint.'''
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'report.json')
+
+            call_command(
+                'benchmark_api',
+                users=3, events=2, tickets=30, iterations=2, warmup=1,
+                output=output, stdout=StringIO(),
+            )
+
+            with open(output) as report_file:
+                report = json.load(report_file)
+
+        self.assertEqual(report['config']['tickets'], 30)
+        self.assertIn('ticket-list', report['endpoints'])
+        stats = report['endpoints']['ticket-pay']
+        self.assertEqual(stats['requests'], 2)
+        self.assertIn('p99', stats['latency_ms'])
+        patched_destroy.assert_called_once()
@@ -0,0 +1,94 @@
+'''
+Tests for the PostgreSQL backend with health checks and pooling.
+'''
+import threading
+import time
+
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+
+from core.db.postgresql.base import DatabaseWrapper
+
+
+class DatabaseBackendTests(TransactionTestCase):
+    '''Test connection health checks and pooling.'''
+
+    def build_wrapper(self, **settings):
+        '''Return a new connection wrapper for the test database.'''
+        settings_dict = dict(connection.settings_dict, **settings)
+        return DatabaseWrapper(settings_dict, alias=connection.alias)
+
+    def tearDown(self):
+        DatabaseWrapper.close_pools()
+
+    def test_pool_reuses_connections(self):
+        '''Test closing a pooled connection hands it to the next user.'''
+        wrapper = self.build_wrapper(POOL={'MIN_SIZE': 1, 'MAX_SIZE': 2})
+        wrapper.ensure_connection()
+        first = wrapper.connection
+        wrapper.close()
+
+        wrapper.ensure_connection()
+
+        self.assertIs(wrapper.connection, first)
+        self.assertFalse(first.closed)
+        wrapper.close()
+
+    def test_exhausted_pool_waits_for_a_connection(self):
+        '''Test a thread waits for a connection instead of failing.'''
+        pool = {'MIN_SIZE': 1, 'MAX_SIZE': 1, 'TIMEOUT': 5}
+        holder = self.build_wrapper(POOL=pool)
+        holder.ensure_connection()
+        held = holder.connection
+        results = []
+
+        def use_connection():
+            wrapper = self.build_wrapper(POOL=pool)
+            wrapper.ensure_connection()
+            results.append(wrapper.connection)
+            wrapper.close()
+
+        thread = threading.Thread(target=use_connection)
+        thread.start()
+        time.sleep(0.2)
+        self.assertEqual(results, [])
+        holder.close()
+        thread.join(5)
+
+        self.assertEqual(results, [held])
+
+    def test_exhausted_pool_times_out(self):
+        '''Test waiting for a connection gives up after the timeout.'''
+        pool = {'MIN_SIZE': 1, 'MAX_SIZE': 1, 'TIMEOUT': 0.1}
+        holder = self.build_wrapper(POOL=pool)
+        holder.ensure_connection()
+        errors = []
+
+        def use_connection():
+            wrapper = self.build_wrapper(POOL=pool)
+            try:
+                wrapper.ensure_connection()
+            except OperationalError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=use_connection)
+        thread.start()
+        thread.join(5)
+        holder.close()
+
+        self.assertEqual(len(errors), 1)
+
+    def test_health_check_replaces_dead_connection(self):
+        '''Test a dead persistent connection is replaced transparently.'''
+        wrapper = self.build_wrapper(CONN_HEALTH_CHECKS=True)
+        wrapper.ensure_connection()
+        dead = wrapper.connection
+        dead.close()
+        wrapper.close_if_unusable_or_obsolete()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+        self.assertIsNot(wrapper.connection, dead)
+        wrapper.close()
@@ -0,0 +1,87 @@
+'''
+Tests for the password hashers.
+'''
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    check_password,
+    identify_hasher,
+    make_password,
+)
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.hashers import ScryptPasswordHasher
+from core.throttling import login_throttle_store
+
+
+class ScryptPasswordHasherTests(SimpleTestCase):
+    '''Test the scrypt hasher.'''
+
+    def test_default_hasher(self):
+        '''Test new passwords are hashed with scrypt.'''
+        encoded = make_password('secret-pass')
+
+        self.assertTrue(encoded.startswith('scrypt$'))
+        self.assertTrue(check_password('secret-pass', encoded))
+        self.assertFalse(check_password('wrong-pass', encoded))
+
+    def test_parameters_stored_in_hash(self):
+        '''Test a hash verifies with the parameters it was made with.'''
+        hasher = ScryptPasswordHasher()
+        encoded = hasher.encode('secret-pass', hasher.salt(), n=2 ** 10)
+
+        self.assertTrue(hasher.verify('secret-pass', encoded))
+        self.assertEqual(hasher.decode(encoded)['work_factor'], 2 ** 10)
+        self.assertTrue(hasher.must_update(encoded))
+
+    def test_current_parameters_need_no_update(self):
+        '''Test a hash made with the current parameters is kept.'''
+        hasher = ScryptPasswordHasher()
+        encoded = hasher.encode('secret-pass', hasher.salt())
+
+        self.assertFalse(hasher.must_update(encoded))
+        self.assertIn('work factor', hasher.safe_summary(encoded))
+
+
+class RehashOnLoginTests(TestCase):
+    '''Test old password hashes are upgraded on login.'''
+
+    def setUp(self):
+        login_throttle_store.clear()
+
+    def test_pbkdf2_rehashed_on_login(self):
+        '''Test logging in replaces a PBKDF2 hash with scrypt.'''
+        user = get_user_model().objects.create_user(email='user@example.com')
+        user.password = make_password('secret-pass', hasher='pbkdf2_sha256')
+        user.save()
+
+        res = APIClient().post(
+            reverse('user:token'),
+            {'email': 'user@example.com', 'password': 'secret-pass'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, 'scrypt')
+
+
+class BenchmarkLoginTests(SimpleTestCase):
+    '''Test the login benchmark command.'''
+
+    @patch('core.management.commands.benchmark_login.get_hashers')
+    def test_reports_each_hasher(self, patched_get_hashers):
+        '''Test a rate is reported per hasher.'''
+        patched_get_hashers.return_value = [ScryptPasswordHasher()]
+        out = StringIO()
+
+        call_command('benchmark_login', logins=1, stdout=out)
+
+        self.assertIn('ScryptPasswordHasher', out.getvalue())
+        self.assertIn('logins/s/core', out.getvalue())
@@ -0,0 +1,188 @@
+'''
+Tests for the background job queue.
+'''
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.models import Event, Job, Ticket
+
+calls = []
+
+
+def remember(value):
+    '''Task recording its argument.'''
+    calls.append(value)
+
+
+def fail(value):
+    '''Task writing a row, then failing.'''
+    get_user_model().objects.create_user(email=f'{value}@example.com')
+    raise ValueError(value)
+
+
+@override_settings(
+    JOB_MAX_ATTEMPTS=3, JOB_RETRY_DELAY=10, JOB_RETRY_DELAY_MAX=15,
+)
+class JobTests(TestCase):
+    '''Test queueing and running jobs.'''
+
+    def setUp(self):
+        calls.clear()
+
+    def test_run_job(self):
+        '''Test a due job is run once and deleted.'''
+        Job.objects.enqueue(remember, value=1)
+
+        self.assertTrue(Job.objects.run_next())
+
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+        self.assertFalse(Job.objects.run_next())
+
+    def test_run_in_order(self):
+        '''Test due jobs run oldest first and future jobs wait.'''
+        later = timezone.now() + timedelta(minutes=1)
+        Job.objects.enqueue(remember, run_at=later, value='later')
+        Job.objects.enqueue('core.tests.test_jobs.remember', value='first')
+        Job.objects.enqueue(remember, value='second')
+
+        self.assertEqual(Job.objects.run_pending(), 2)
+
+        self.assertEqual(calls, ['first', 'second'])
+        self.assertEqual(Job.objects.get().kwargs, {'value': 'later'})
+
+    def test_failure_retried_with_backoff(self):
+        '''Test a failing job is rolled back and rescheduled.'''
+        job = Job.objects.enqueue(fail, value='retry')
+
+        with self.assertLogs('core.jobs', 'ERROR'):
+            Job.objects.run_next()
+
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('ValueError: retry', job.last_error)
+        self.assertIsNone(job.failed_at)
+        delay = (job.run_at - timezone.now()).total_seconds()
+        self.assertTrue(4 < delay <= 10)
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(Job.objects.run_next())
+
+    def test_backoff_capped(self):
+        '''Test the delay doubles per attempt up to the maximum.'''
+        job = Job(attempts=2)
+        with patch('core.models.random.uniform', return_value=1):
+            self.assertEqual(job.get_retry_delay(), 15)
+            job.attempts = 1
+            self.assertEqual(job.get_retry_delay(), 10)
+
+    def test_failed_after_max_attempts(self):
+        '''Test a job is marked failed after its last attempt.'''
+        job = Job.objects.enqueue(fail, value='failed')
+        Job.objects.filter(pk=job.pk).update(attempts=2)
+
+        with self.assertLogs('core.jobs', 'ERROR'):
+            Job.objects.run_next(now=timezone.now())
+
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 3)
+        self.assertIsNotNone(job.failed_at)
+        self.assertFalse(Job.objects.pending().exists())
+
+    def test_enqueue_rolled_back(self):
+        '''Test a job queued in a rolled back transaction is dropped.'''
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                Job.objects.enqueue(remember, value=1)
+                raise ValueError
+
+        self.assertFalse(Job.objects.exists())
+
+    def test_pay_queues_payment_counters(self):
+        '''Test paying leaves the event counters to a job.'''
+        user = get_user_model().objects.create_user(email='u@example.com')
+        event = Event.objects.create(
+            owner=user,
+            name='Test event',
+            description='Test description',
+            started_at=timezone.now(),
+            duration_hours=5,
+        )
+        ticket = Ticket.objects.create(
+            owner=user, event=event, price=Decimal('12.50'),
+        )
+
+        ticket.pay()
+        event.refresh_from_db()
+        self.assertEqual(event.paid_count, 0)
+
+        call_command('run_jobs', '--once', stdout=StringIO())
+        event.refresh_from_db()
+        self.assertEqual(event.paid_count, 1)
+        self.assertEqual(event.revenue, Decimal('12.50'))
+
+    def test_command(self):
+        '''Test the command drains the queue and reports the count.'''
+        for value in range(3):
+            Job.objects.enqueue(remember, value=value)
+        out = StringIO()
+
+        call_command('run_jobs', '--once', stdout=out)
+
+        self.assertIn('Ran 3 jobs.', out.getvalue())
+        self.assertEqual(calls, [0, 1, 2])
+
+
+# Worker threads must not keep connections to the test database.
+@patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 0})
+class ConcurrentJobTests(TransactionTestCase):
+    '''Test workers never run the same job twice.'''
+
+    def setUp(self):
+        calls.clear()
+
+    def test_locked_job_skipped(self):
+        '''Test a job claimed by another worker is skipped.'''
+        Job.objects.enqueue(remember, value='locked')
+        Job.objects.enqueue(remember, value='free')
+        claimed = threading.Event()
+        release = threading.Event()
+
+        def hold_first_job():
+            with transaction.atomic():
+                Job.objects.select_for_update().filter(
+                    kwargs__value='locked',
+                ).get()
+                claimed.set()
+                release.wait(5)
+            connection.close()
+
+        worker = threading.Thread(target=hold_first_job)
+        worker.start()
+        claimed.wait(5)
+        try:
+            self.assertTrue(Job.objects.run_next())
+            self.assertFalse(Job.objects.run_next())
+        finally:
+            release.set()
+            worker.join()
+
+        self.assertEqual(calls, ['free'])
+
+    def test_worker_pool(self):
+        '''Test a pool of workers runs every job exactly once.'''
+        for value in range(20):
+            Job.objects.enqueue(remember, value=value)
+
+        call_command('run_jobs', '--once', '--workers', '4', stdout=StringIO())
+
+        self.assertEqual(sorted(calls), list(range(20)))
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,78 @@
+'''
+Tests for the query counting middleware.
+'''
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import middleware
+
+ME_URL = reverse('user:me')
+
+
+class QueryCountMiddlewareTests(TestCase):
+    '''Test recording queries per request.'''
+
+    def setUp(self):
+        middleware.reset_route_stats()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass1',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_stats_attached_to_request(self):
+        '''Test the request carries its label and query count.'''
+        res = self.client.patch(ME_URL, {'name': 'New name'})
+
+        stats = res.wsgi_request.query_stats
+        self.assertEqual(stats.label, 'ManageUserView')
+        self.assertGreater(stats.count, 0)
+        self.assertGreater(stats.duration, 0)
+
+    @override_settings(DEBUG=True)
+    def test_headers_in_debug(self):
+        '''Test the stats are exposed as headers in debug mode.'''
+        res = self.client.patch(ME_URL, {'name': 'New name'})
+
+        self.assertIn('db;dur=', res['Server-Timing'])
+        self.assertEqual(
+            res['X-Query-Count'],
+            str(res.wsgi_request.query_stats.count),
+        )
+
+    def test_no_headers_without_debug(self):
+        '''Test the headers are hidden outside debug mode.'''
+        res = self.client.get(ME_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+    def test_duplicates_and_route_aggregates(self):
+        '''Test repeated statements and per-route totals are recorded.'''
+        stats = middleware.QueryStats()
+        stats.label = 'Example.list'
+        stats.fingerprints.update(['a', 'a', 'b'])
+        stats.statements.update({'a': 'SELECT a', 'b': 'SELECT b'})
+        stats.count = 3
+
+        middleware.record_route(stats)
+        middleware.record_route(stats)
+
+        self.assertEqual(stats.duplicates, {'SELECT a': 2})
+        route = middleware.get_route_stats()['Example.list']
+        self.assertEqual(route['requests'], 2)
+        self.assertEqual(route['queries'], 6)
+        self.assertEqual(route['duplicated_requests'], 2)
+
+    def test_unmatched_requests_share_a_route(self):
+        '''Test unknown URLs are aggregated under one label.'''
+        for path in ('/missing/1/', '/missing/2/', '/api/nothing/'):
+            res = self.client.get(path)
+            self.assertEqual(res.status_code, 404)
+
+        routes = middleware.get_route_stats()
+        self.assertEqual(list(routes), [middleware.UNMATCHED_ROUTE])
+        self.assertEqual(routes[middleware.UNMATCHED_ROUTE]['requests'], 3)
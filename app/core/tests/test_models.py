@@ -93,3 +93,49 @@ class ModelTests(TestCase):
         ticket.pay()
         self.assertTrue(ticket.paid)
         self.assertIsNotNone(ticket.paid_at)
+
+    def test_reserve_seats_until_sold_out(self):
+        '''Test seats can be reserved until the capacity is reached.'''
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        event = models.Event.objects.create(
+            name='Pool Party',
+            description='Pool Party',
+            started_at=timezone.now(),
+            duration_hours=5,
+            capacity=2,
+            owner=user,
+        )
+
+        event.reserve_seats(2)
+        with self.assertRaises(models.SoldOut):
+            event.reserve_seats()
+
+        event.refresh_from_db()
+        self.assertEqual(event.sold, 2)
+
+    def test_pay_ticket_only_once(self):
+        '''Test paying an already paid ticket is rejected.'''
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        event = models.Event.objects.create(
+            name='Pool Party',
+            description='Pool Party',
+            started_at=timezone.now(),
+            duration_hours=5,
+            owner=user,
+        )
+        ticket = models.Ticket.objects.create(
+            event=event,
+            owner=user,
+            price=Decimal('10.00'),
+        )
+        stale = models.Ticket.objects.get(pk=ticket.pk)
+
+        self.assertTrue(ticket.pay())
+        self.assertFalse(stale.pay())
+        self.assertFalse(stale.paid)
@@ -0,0 +1,77 @@
+'''
+Tests for login throttling.
+'''
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.throttling import SlidingWindowStore, login_throttle_store
+
+TOKEN_URL = reverse('user:token')
+
+
+class SlidingWindowStoreTests(SimpleTestCase):
+    '''Test the in-process sliding window.'''
+
+    def test_limit_within_window(self):
+        '''Test requests beyond the limit are refused until they expire.'''
+        store = SlidingWindowStore()
+
+        self.assertEqual(store.hit('key', 2, 60, now=0), (True, 0))
+        self.assertEqual(store.hit('key', 2, 60, now=10), (True, 0))
+        self.assertEqual(store.hit('key', 2, 60, now=20), (False, 0))
+        self.assertEqual(store.hit('key', 2, 60, now=61), (True, 10))
+
+    def test_keys_independent(self):
+        '''Test each key has its own window.'''
+        store = SlidingWindowStore()
+        store.hit('first', 1, 60, now=0)
+
+        allowed, _ = store.hit('second', 1, 60, now=0)
+
+        self.assertTrue(allowed)
+
+    def test_least_recent_keys_evicted(self):
+        '''Test the store stays within its size.'''
+        store = SlidingWindowStore(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            store.hit(key, 1, 60, now=0)
+
+        allowed, _ = store.hit('a', 1, 60, now=0)
+
+        self.assertTrue(allowed)
+
+
+class LoginThrottleApiTests(TestCase):
+    '''Test throttling the token endpoint.'''
+
+    def setUp(self):
+        login_throttle_store.clear()
+        self.client = APIClient()
+        get_user_model().objects.create_user(
+            email='user@example.com', password='secret-pass',
+        )
+        self.payload = {'email': 'user@example.com', 'password': 'wrong'}
+
+    @override_settings(LOGIN_THROTTLE_RATE='2/min')
+    def test_attempts_throttled(self):
+        '''Test attempts beyond the rate are refused with a retry time.'''
+        for _ in range(2):
+            res = self.client.post(TOKEN_URL, self.payload)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+
+    @override_settings(LOGIN_THROTTLE_RATE=None)
+    def test_throttle_disabled(self):
+        '''Test an empty rate disables throttling.'''
+        for _ in range(3):
+            res = self.client.post(TOKEN_URL, self.payload)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
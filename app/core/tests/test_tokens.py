@@ -0,0 +1,124 @@
+'''
+Tests for expiring auth tokens.
+'''
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from core.authentication import CachedTokenAuthentication, token_cache
+from core.models import AuthToken
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def authenticate(key):
+    '''Authenticate a request carrying `key`.'''
+    request = APIRequestFactory().get(
+        '/', HTTP_AUTHORIZATION=f'Token {key}'
+    )
+    return CachedTokenAuthentication().authenticate(request)
+
+
+def age(token, seconds):
+    '''Move a token's last use and expiry `seconds` into the past.'''
+    delta = timedelta(seconds=seconds)
+    AuthToken.objects.filter(pk=token.pk).update(
+        last_used=token.last_used - delta,
+        expires_at=token.expires_at - delta,
+    )
+    token.refresh_from_db()
+
+
+@override_settings(TOKEN_TTL=3600, TOKEN_TOUCH_INTERVAL=60)
+class AuthTokenTests(TestCase):
+    '''Test issuing, expiring and purging tokens.'''
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = create_user(email='user@example.com', password='pass')
+        self.token = AuthToken.objects.issue(self.user)
+
+    def test_issue(self):
+        '''Test a new token expires after the TTL.'''
+        self.assertEqual(len(self.token.key), 40)
+        self.assertEqual(
+            self.token.expires_at - self.token.last_used,
+            timedelta(seconds=3600),
+        )
+        self.assertFalse(self.token.expired)
+
+    def test_tokens_are_unique(self):
+        '''Test each login gets its own token.'''
+        other = AuthToken.objects.issue(self.user)
+
+        self.assertNotEqual(other.key, self.token.key)
+        self.assertEqual(self.user.auth_tokens.count(), 2)
+
+    def test_expired_token_rejected(self):
+        '''Test an expired token is rejected, even when cached.'''
+        authenticate(self.token.key)
+        age(self.token, 3600)
+        token_cache.set(self.token.key, (self.user, self.token))
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'expired'):
+            authenticate(self.token.key)
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_use_within_interval_not_written(self):
+        '''Test repeated use within the interval does not write.'''
+        authenticate(self.token.key)
+        age(self.token, 30)
+        token_cache.clear()
+
+        with self.assertNumQueries(1):
+            authenticate(self.token.key)
+
+    def test_use_after_interval_extends_expiry(self):
+        '''Test use after the interval records it and extends the expiry.'''
+        age(self.token, 120)
+        expires_at = self.token.expires_at
+
+        with self.assertNumQueries(2):
+            authenticate(self.token.key)
+
+        self.token.refresh_from_db()
+        self.assertGreater(self.token.expires_at, expires_at)
+        with self.assertNumQueries(0):
+            authenticate(self.token.key)
+
+    def test_concurrent_touch_coalesced(self):
+        '''Test only the first of two stale copies writes.'''
+        age(self.token, 120)
+        stale = AuthToken.objects.get(pk=self.token.pk)
+
+        self.assertTrue(self.token.touch())
+        self.assertFalse(stale.touch())
+
+    def test_purge_in_batches(self):
+        '''Test every expired token is deleted across batches.'''
+        for _ in range(4):
+            age(AuthToken.objects.issue(self.user), 3600)
+
+        deleted = AuthToken.objects.purge_expired(batch_size=3)
+
+        self.assertEqual(deleted, 4)
+        self.assertEqual(list(AuthToken.objects.all()), [self.token])
+
+    def test_command(self):
+        '''Test the command reports the deleted tokens.'''
+        age(self.token, 3600)
+        out = StringIO()
+
+        call_command('purge_tokens', stdout=out)
+
+        self.assertIn('Deleted 1 expired tokens.', out.getvalue())
+        self.assertFalse(AuthToken.objects.exists())
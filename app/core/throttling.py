@@ -0,0 +1,88 @@
+'''
+Request throttling backed by an in-process sliding window.
+'''
+import threading
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowStore:
+    '''
+    Timestamps of recent requests per key, kept in process memory.
+
+    Checking and recording a request happen under one lock, so
+    concurrent requests cannot both take the last slot. The least
+    recently seen keys are dropped beyond `max_keys`.
+    '''
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, duration, now):
+        '''
+        Record a request at `now` unless `limit` requests were already
+        made in the last `duration` seconds. Return whether it was allowed
+        and the time of the oldest request still in the window.
+        '''
+        with self._lock:
+            window = self._windows.pop(key, None) or deque()
+            while window and window[0] <= now - duration:
+                window.popleft()
+
+            allowed = len(window) < limit
+            if allowed:
+                window.append(now)
+
+            self._windows[key] = window
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+
+            return allowed, window[0]
+
+    def clear(self):
+        '''Forget every window.'''
+        with self._lock:
+            self._windows.clear()
+
+
+login_throttle_store = SlidingWindowStore()
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    '''Limit login attempts per client IP to `LOGIN_THROTTLE_RATE`.'''
+    scope = 'login'
+    store = login_throttle_store
+
+    def get_rate(self):
+        '''Return the configured rate, or `None` to disable throttling.'''
+        return settings.LOGIN_THROTTLE_RATE
+
+    def get_cache_key(self, request, view):
+        '''Key attempts on the client IP.'''
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+    def allow_request(self, request, view):
+        '''Return whether the request fits in the sliding window.'''
+        if self.rate is None:
+            return True
+
+        self.now = self.timer()
+        allowed, self.oldest = self.store.hit(
+            self.get_cache_key(request, view),
+            self.num_requests,
+            self.duration,
+            self.now,
+        )
+        return allowed
+
+    def wait(self):
+        '''Return the seconds until the oldest attempt leaves the window.'''
+        return max(self.oldest + self.duration - self.now, 0)
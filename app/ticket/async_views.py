@@ -0,0 +1,120 @@
+'''
+Async read views for the ticket APIs, served natively under ASGI.
+'''
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotModified
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from core.authentication import token_required
+from core.concurrency import (
+    database_sync_to_async,
+    json_response,
+    read_only,
+)
+from core.models import Ticket, TicketHistory, Event
+from ticket import serializers
+from ticket.caching import event_cache
+from ticket.filters import filter_events, include_past_tickets
+from ticket.pagination import TicketPagination, EventPagination
+
+# Sparse fieldset parameters of the sync lists, not served here.
+UNSUPPORTED_PARAMS = ('fields', 'expand')
+
+
+def reject_unsupported_params(request):
+    '''Raise `ValidationError` for parameters only the sync API serves.'''
+    errors = {
+        param: 'Not supported by the async endpoint.'
+        for param in UNSUPPORTED_PARAMS
+        if param in request.GET
+    }
+    if errors:
+        raise ValidationError(errors)
+
+
+def paginate(paginator, request, queryset, serializer_class):
+    '''Return one serialized page of `queryset`.'''
+    request = Request(request)
+    page = paginator.paginate_queryset(queryset, request)
+    data = serializer_class(page, many=True).data
+    return paginator.get_paginated_response(data).data
+
+
+@read_only
+@token_required
+async def ticket_list(request):
+    '''
+    List the authenticated user's tickets, with archived tickets of past
+    events on request with `?include_past=true`.
+    '''
+    reject_unsupported_params(request)
+    model = Ticket
+    if include_past_tickets(request.GET):
+        model = TicketHistory
+    queryset = model.objects.filter(owner=request.user).order_by(
+        '-created_at', '-id'
+    )
+    data = await database_sync_to_async(paginate)(
+        TicketPagination(), request, queryset, serializers.TicketSerializer,
+    )
+    return json_response(data)
+
+
+@read_only
+@token_required
+async def ticket_detail(request, pk):
+    '''Return one of the authenticated user's tickets, archived or not.'''
+    def retrieve():
+        ticket = TicketHistory.objects.filter(
+            owner=request.user, pk=pk,
+        ).first()
+        if ticket is None:
+            return None
+        return serializers.TicketDetailSerializer(ticket).data
+
+    data = await database_sync_to_async(retrieve)()
+    if data is None:
+        return json_response(
+            {'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND,
+        )
+    return json_response(data)
+
+
+@read_only
+@token_required
+async def event_list(request):
+    '''
+    List events matching the event list filters, served from the
+    catalogue cache when possible.
+    '''
+    reject_unsupported_params(request)
+
+    def list_events():
+        queryset = filter_events(Event.objects.all(), request.GET)
+        return paginate(
+            EventPagination(), request, queryset,
+            serializers.EventSerializer,
+        )
+
+    def lookup():
+        key = event_cache.get_key(request)
+        return key, event_cache.cache.get(key)
+
+    def fill(key):
+        return event_cache.store(key, list_events())
+
+    # A cache outside the process is network I/O, kept off the loop.
+    if event_cache.in_process:
+        key, entry = lookup()
+    else:
+        key, entry = await sync_to_async(lookup, thread_sensitive=False)()
+    if entry is None:
+        entry = await database_sync_to_async(fill)(key)
+
+    if event_cache.is_not_modified(request, entry):
+        response = HttpResponseNotModified()
+    else:
+        response = json_response(entry['data'])
+    return event_cache.patch_headers(response, entry)
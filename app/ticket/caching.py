@@ -0,0 +1,123 @@
+'''
+Versioned response caching for read-mostly ticket APIs.
+'''
+import functools
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import parse_etags
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ResponseCache:
+    '''
+    Cache serialized responses under a version that writes bump.
+
+    Entries are keyed on `(version, full path)`, so bumping the version
+    invalidates every cached page at once without deleting keys. Each
+    entry carries an ETag hashed from its data, which is used to answer
+    `If-None-Match` with 304. Counters updated without signals (such as
+    `Event.sold`) are at most `timeout` seconds stale.
+    '''
+
+    def __init__(self, prefix, alias='default', timeout=60):
+        self.prefix = prefix
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        '''Return the Django cache backend.'''
+        return caches[self.alias]
+
+    @property
+    def in_process(self):
+        '''Return whether the backend lives in process memory, without I/O.'''
+        return isinstance(self.cache, (LocMemCache, DummyCache))
+
+    @property
+    def version_key(self):
+        '''Return the key holding the current version.'''
+        return f'{self.prefix}:version'
+
+    def get_version(self):
+        '''Return the current version, starting a new one if missing.'''
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, time.time_ns(), None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def bump(self):
+        '''Invalidate every cached response.'''
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.set(self.version_key, time.time_ns(), None)
+
+    def get_key(self, request):
+        '''Return the cache key for a request.'''
+        url = request.build_absolute_uri()
+        digest = hashlib.md5(url.encode()).hexdigest()
+        return f'{self.prefix}:{self.get_version()}:{digest}'
+
+    @staticmethod
+    def get_etag(data):
+        '''Return a strong ETag for serialized data.'''
+        content = json.dumps(data, cls=JSONEncoder, sort_keys=True)
+        return '"%s"' % hashlib.md5(content.encode()).hexdigest()
+
+    def store(self, key, data):
+        '''Cache serialized `data` under `key` and return the entry.'''
+        entry = {'data': data, 'etag': self.get_etag(data)}
+        self.cache.set(key, entry, self.timeout)
+        return entry
+
+    @staticmethod
+    def is_not_modified(request, entry):
+        '''Return whether the client already holds the cached entry.'''
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        etags = parse_etags(if_none_match)
+        return entry['etag'] in etags or '*' in etags
+
+    @staticmethod
+    def patch_headers(response, entry):
+        '''Add the validator and caching headers to a response.'''
+        response['ETag'] = entry['etag']
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def cached(self, handler):
+        '''Decorate a viewset action so its responses are cached.'''
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key = self.get_key(request)
+            entry = self.cache.get(key)
+            if entry is None:
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                entry = self.store(key, response.data)
+
+            if self.is_not_modified(request, entry):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = Response(entry['data'])
+            return self.patch_headers(response, entry)
+
+        return wrapper
+
+
+event_cache = ResponseCache(
+    'event-catalogue',
+    alias=settings.EVENT_CACHE['ALIAS'],
+    timeout=settings.EVENT_CACHE['TIMEOUT'],
+)
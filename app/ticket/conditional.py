@@ -0,0 +1,281 @@
+'''
+Conditional requests (ETag/Last-Modified) for ticket and event resources.
+'''
+import hashlib
+from calendar import timegm
+
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    '''Raised when an `If-Match` or `If-Unmodified-Since` check fails.'''
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = _('The resource has been modified since it was read.')
+    default_code = 'precondition_failed'
+
+
+def make_etag(*parts):
+    '''Return a strong ETag for a version made of `parts`.'''
+    content = ':'.join(str(part) for part in parts)
+    return '"%s"' % hashlib.md5(content.encode()).hexdigest()
+
+
+class ConditionalMixin:
+    '''
+    Base of the conditional request mixins.
+
+    Validators are derived from `version_field` (`updated_at`), so they
+    can be computed before anything is serialized: for details with one
+    narrow query, for lists from the rows of the fetched page.
+    '''
+    version_field = 'updated_at'
+
+    def get_object_version(self, lock=False):
+        '''Return the version of the requested object, or `None`.'''
+        queryset = self.filter_queryset(self.get_queryset())
+        if lock:
+            queryset = queryset.select_for_update()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        return queryset.filter(**lookup).values_list(
+            self.version_field, flat=True,
+        ).first()
+
+    def get_object_validators(self, version):
+        '''Return the `(etag, last_modified)` of an object's version.'''
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        etag = make_etag(
+            self.queryset.model._meta.label,
+            self.kwargs[lookup_url_kwarg],
+            version.isoformat(),
+            self.request.accepted_renderer.format,
+        )
+        return etag, timegm(version.utctimetuple())
+
+    def evaluate_preconditions(self, request, etag, last_modified=None):
+        '''
+        Return a 304 response if the client's copy is current, `None` to
+        handle the request, or raise `PreconditionFailed`.
+        '''
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+        if response is None:
+            return None
+        if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+            raise PreconditionFailed()
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        return self.patch_validators(response, etag, last_modified)
+
+    @staticmethod
+    def patch_validators(response, etag, last_modified=None):
+        '''Add the validator and caching headers to a response.'''
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class ConditionalListMixin(ConditionalMixin):
+    '''
+    Answer `If-None-Match` on paginated list actions.
+
+    The ETag is derived from the `(id, updated_at)` of the fetched page's
+    rows, the versions of expanded relations, the page's navigation and
+    the query string, so it costs no query of its own and different pages
+    never share a validator. Expanded relations without a version field
+    contribute the values returned for them instead. A current page is
+    answered with 304 before it is serialized. Lists carry no
+    `Last-Modified`.
+    '''
+
+    def get_version_relations(self):
+        '''Return the relation paths whose changes alter the list.'''
+        return ()
+
+    def split_version_relations(self):
+        '''
+        Return the lookup prefixes (`'event__'`) of the version relations
+        with and without a version field.
+        '''
+        versioned, unversioned = [], []
+        for path in sorted(self.get_version_relations()):
+            model = self.queryset.model
+            for name in path.split('.'):
+                model = model._meta.get_field(name).related_model
+            fields = {field.name for field in model._meta.get_fields()}
+            prefix = path.replace('.', '__') + '__'
+            if self.version_field in fields:
+                versioned.append(prefix)
+            else:
+                unversioned.append(prefix)
+        return versioned, unversioned
+
+    def get_version_lookups(self):
+        '''Return the lookups whose values make up a row's version.'''
+        versioned, _ = self.split_version_relations()
+        return ['id', self.version_field] + [
+            prefix + self.version_field for prefix in versioned
+        ]
+
+    def get_list_columns(self):
+        '''Read the version columns along with the returned ones.'''
+        return super().get_list_columns() | set(self.get_version_lookups())
+
+    def get_row_version(self, row, lookups, unversioned=()):
+        '''
+        Return the version of a `.values()` row or model instance. The
+        relations under the `unversioned` prefixes are compared by the
+        values read for them.
+        '''
+        if isinstance(row, dict):
+            version = [row[lookup] for lookup in lookups]
+            for prefix in unversioned:
+                version += [
+                    (column, row[column]) for column in sorted(row)
+                    if column.startswith(prefix)
+                ]
+            return version
+
+        version = [self.follow(row, lookup) for lookup in lookups]
+        for prefix in unversioned:
+            related = self.follow(row, prefix[:-2])
+            if related is not None:
+                version += [
+                    getattr(related, field.attname)
+                    for field in related._meta.concrete_fields
+                ]
+        return version
+
+    @staticmethod
+    def follow(instance, lookup):
+        '''Return the value at `lookup` from `instance`, or `None`.'''
+        value = instance
+        for name in lookup.split('__'):
+            value = getattr(value, name, None)
+        return value
+
+    def get_list_etag(self, page):
+        '''Return the ETag of a fetched page.'''
+        lookups = self.get_version_lookups()
+        _, unversioned = self.split_version_relations()
+        # The response without its results: links and counts.
+        navigation = self.paginator.get_paginated_response([]).data
+        return make_etag(
+            self.queryset.model._meta.label,
+            self.request.get_full_path(),
+            self.request.accepted_renderer.format,
+            sorted(navigation.items()),
+            *(
+                self.get_row_version(row, lookups, unversioned)
+                for row in page
+            ),
+        )
+
+    def paginate_queryset(self, queryset):
+        '''
+        Fetch the page and evaluate the client's preconditions against it.
+        A current page is replaced by an empty one, so nothing is
+        serialized before `list` answers with 304.
+        '''
+        page = super().paginate_queryset(queryset)
+        if page is None or self.action != 'list':
+            return page
+
+        self.list_etag = self.get_list_etag(page)
+        self.not_modified = self.evaluate_preconditions(
+            self.request, self.list_etag,
+        )
+        if self.not_modified is not None:
+            return []
+        return page
+
+    def list(self, request, *args, **kwargs):
+        '''List objects unless the client's copy is current.'''
+        self.list_etag = self.not_modified = None
+        response = super().list(request, *args, **kwargs)
+        if self.not_modified is not None:
+            return self.not_modified
+        if self.list_etag is not None:
+            self.patch_validators(response, self.list_etag)
+        return response
+
+
+class ConditionalRetrieveMixin(ConditionalMixin):
+    '''
+    Answer `If-None-Match`/`If-Modified-Since` on retrieve. The version
+    is only looked up for conditional requests; others load the object
+    and take the validators from it.
+    '''
+
+    def retrieve(self, request, *args, **kwargs):
+        '''Retrieve an object unless the client's copy is current.'''
+        headers = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+        version = None
+        if any(header in request.META for header in headers):
+            version = self.get_object_version()
+        if version is not None:
+            not_modified = self.evaluate_preconditions(
+                request, *self.get_object_validators(version),
+            )
+            if not_modified is not None:
+                return not_modified
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        response = Response(serializer.data)
+        version = getattr(instance, self.version_field)
+        return self.patch_validators(
+            response, *self.get_object_validators(version),
+        )
+
+
+class ConditionalUpdateMixin(ConditionalMixin):
+    '''
+    Honour `If-Match`/`If-Unmodified-Since` on updates and deletes.
+
+    The object's row is locked while the precondition is checked, so it
+    cannot change between the check and the write.
+    '''
+
+    def check_preconditions(self, request):
+        '''Raise `PreconditionFailed` if the client's copy is stale.'''
+        headers = ('HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE')
+        if not any(header in request.META for header in headers):
+            return
+
+        version = self.get_object_version(lock=True)
+        if version is not None:
+            self.evaluate_preconditions(
+                request, *self.get_object_validators(version),
+            )
+
+    def update(self, request, *args, **kwargs):
+        '''Update an object if the client's copy is current.'''
+        with transaction.atomic():
+            self.check_preconditions(request)
+            response = super().update(request, *args, **kwargs)
+        return self.patch_validators(
+            response, *self.get_object_validators(self.updated_version),
+        )
+
+    def perform_update(self, serializer):
+        '''Save the object and remember its new version.'''
+        super().perform_update(serializer)
+        self.updated_version = getattr(
+            serializer.instance, self.version_field,
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        '''Delete an object if the client's copy is current.'''
+        with transaction.atomic():
+            self.check_preconditions(request)
+            return super().destroy(request, *args, **kwargs)
@@ -0,0 +1,119 @@
+'''
+Streaming exports of ticket data.
+'''
+import csv
+import zlib
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+from core.models import TicketHistory
+
+EXPORT_FIELDS = (
+    'id',
+    'owner__email',
+    'owner__name',
+    'price',
+    'paid',
+    'paid_at',
+    'created_at',
+)
+EXPORT_HEADER = (
+    'ticket_id',
+    'email',
+    'name',
+    'price',
+    'paid',
+    'paid_at',
+    'created_at',
+)
+
+
+class CSVRenderer(JSONRenderer):
+    '''Accept `text/csv`; errors are still rendered as JSON.'''
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(JSONRenderer):
+    '''Accept `application/x-ndjson`; errors are rendered as JSON.'''
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class Echo:
+    '''File-like object whose `write` returns the written value.'''
+
+    def write(self, value):
+        return value
+
+
+def ticket_rows(event_id, after=0, chunk_size=2000):
+    '''
+    Yield export rows for an event in id order from a server cursor,
+    including tickets already moved to the archive.
+    '''
+    queryset = TicketHistory.objects.filter(
+        event_id=event_id,
+        id__gt=after,
+    ).order_by('id').values_list(*EXPORT_FIELDS)
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def batched(rows, size):
+    '''Yield lists of up to `size` rows.'''
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def csv_stream(rows, batch_size=500):
+    '''Yield the rows as CSV text, a batch of lines at a time.'''
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADER)
+    for batch in batched(rows, batch_size):
+        yield ''.join(writer.writerow(row) for row in batch)
+
+
+def ndjson_stream(rows, batch_size=500):
+    '''Yield the rows as newline delimited JSON objects.'''
+    encoder = DjangoJSONEncoder()
+    for batch in batched(rows, batch_size):
+        yield ''.join(
+            encoder.encode(dict(zip(EXPORT_HEADER, row))) + '\n'
+            for row in batch
+        )
+
+
+def gzip_stream(chunks):
+    '''Compress a stream of text chunks into a gzip byte stream.'''
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding):
+    '''
+    Return whether an Accept-Encoding header allows a gzip response:
+    `gzip` itself, or failing that `*`, must be listed with a non-zero q.
+    '''
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities.setdefault(coding.lower(), quality)
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
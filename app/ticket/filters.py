@@ -0,0 +1,97 @@
+'''
+Server-side filtering for the ticket list and full-text search for the
+event catalogue.
+'''
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+SEARCH_CONFIG = 'english'
+
+# Must match the expression of the `event_search_idx` GIN index.
+EVENT_SEARCH_VECTOR = SearchVector(
+    'name', 'description', config=SEARCH_CONFIG,
+)
+
+_trigram_support = {}
+
+
+def has_trigram_support(using='default'):
+    '''Return whether the `pg_trgm` extension is installed.'''
+    if using not in _trigram_support:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+            )
+            _trigram_support[using] = cursor.fetchone() is not None
+    return _trigram_support[using]
+
+
+class TicketFilterSerializer(serializers.Serializer):
+    '''Validate the query parameters of the ticket list.'''
+    include_past = serializers.BooleanField(required=False, default=False)
+
+
+def include_past_tickets(query_params):
+    '''Return whether archived tickets of past events were requested.'''
+    params = TicketFilterSerializer(data=query_params)
+    params.is_valid(raise_exception=True)
+    return params.validated_data['include_past']
+
+
+class EventFilterSerializer(serializers.Serializer):
+    '''Validate the query parameters filtering the event list.'''
+    q = serializers.CharField(required=False, max_length=200)
+    owner = serializers.IntegerField(required=False, min_value=1)
+    started_after = serializers.DateTimeField(required=False)
+    started_before = serializers.DateTimeField(required=False)
+    upcoming = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        '''Reject empty date ranges.'''
+        after = attrs.get('started_after')
+        before = attrs.get('started_before')
+        if after and before and after > before:
+            raise serializers.ValidationError(
+                {'started_before': 'Must not be before started_after.'}
+            )
+        return attrs
+
+
+def search_events(queryset, text):
+    '''
+    Filter events matching `text` in their name or description.
+
+    Full-text matches use the `event_search_idx` GIN index. Where
+    `pg_trgm` is installed, names similar to `text` also match so typos
+    and partial words still find events, using `event_name_trgm_idx`.
+    '''
+    condition = Q(search=SearchQuery(
+        text, config=SEARCH_CONFIG, search_type='websearch',
+    ))
+    if has_trigram_support(queryset.db):
+        condition |= Q(name__trigram_similar=text)
+    return queryset.alias(search=EVENT_SEARCH_VECTOR).filter(condition)
+
+
+def filter_events(queryset, query_params):
+    '''Apply the validated event list filters to `queryset`.'''
+    params = EventFilterSerializer(data=query_params)
+    params.is_valid(raise_exception=True)
+    filters = params.validated_data
+
+    if 'owner' in filters:
+        queryset = queryset.filter(owner_id=filters['owner'])
+    if 'started_after' in filters:
+        queryset = queryset.filter(started_at__gte=filters['started_after'])
+    if 'started_before' in filters:
+        queryset = queryset.filter(
+            started_at__lte=filters['started_before']
+        )
+    if filters['upcoming']:
+        queryset = queryset.filter(started_at__gte=timezone.now())
+    if filters.get('q', '').strip():
+        queryset = search_events(queryset, filters['q'])
+    return queryset
@@ -0,0 +1,150 @@
+'''
+Bulk import of event catalogues through a COPY staging table.
+'''
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from core.models import Event
+from ticket.caching import event_cache
+
+IMPORT_FIELDS = (
+    'name',
+    'description',
+    'started_at',
+    'duration_hours',
+    'capacity',
+)
+
+STAGING_TABLE = 'event_import'
+
+CREATE_STAGING = f'''
+    CREATE TEMPORARY TABLE {STAGING_TABLE} (
+        line integer NOT NULL,
+        name text NOT NULL,
+        description text NOT NULL,
+        started_at timestamptz NOT NULL,
+        duration_hours numeric(5, 2) NOT NULL,
+        capacity integer
+    )
+'''
+
+COPY_STAGING = (
+    f'COPY {STAGING_TABLE} (line, {", ".join(IMPORT_FIELDS)}) '
+    f'FROM STDIN WITH (FORMAT csv)'
+)
+
+INSERT_EVENTS = f'''
+    INSERT INTO {Event._meta.db_table} (
+        created_at, updated_at, owner_id, sold, paid_count, revenue,
+        {", ".join(IMPORT_FIELDS)}
+    )
+    SELECT now(), now(), %s, 0, 0, 0, {", ".join(IMPORT_FIELDS)}
+    FROM {STAGING_TABLE}
+    ORDER BY line
+'''
+
+
+class EventImportSerializer(serializers.ModelSerializer):
+    '''Validate one imported event.'''
+
+    class Meta:
+        model = Event
+        fields = IMPORT_FIELDS
+
+
+def csv_records(stream):
+    '''
+    Yield `(line, record)` for each row of a CSV file with a header.
+    Empty cells are left out, as if the column were missing.
+    '''
+    reader = csv.DictReader(stream)
+    for record in reader:
+        record = {key: value for key, value in record.items() if value}
+        yield reader.line_num, record
+
+
+def ndjson_records(stream):
+    '''Yield `(line, record)` for each non-blank line of an NDJSON file.'''
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as error:
+            record = error
+        yield line, record
+
+
+class EventImporter:
+    '''
+    Load events for `owner` from `(line, record)` pairs.
+
+    Records are validated a chunk at a time and the valid ones copied into
+    a temporary staging table with `COPY FROM STDIN`. One `INSERT ...
+    SELECT` then creates all events, in the same transaction. Rejected
+    records are collected in `errors` as `(line, field, message)`.
+    '''
+
+    def __init__(self, owner, chunk_size=1000):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.errors = []
+
+    def validate(self, chunk):
+        '''Return the staging rows of the valid records in `chunk`.'''
+        rows = []
+        for line, record in chunk:
+            if not isinstance(record, dict):
+                self.errors.append((line, '', f'Invalid record: {record}'))
+                continue
+
+            serializer = EventImportSerializer(data=record)
+            if not serializer.is_valid():
+                for field, messages in serializer.errors.items():
+                    for message in messages:
+                        self.errors.append((line, field, str(message)))
+                continue
+
+            data = serializer.validated_data
+            rows.append([line] + [
+                None if data.get(field) is None else str(data[field])
+                for field in IMPORT_FIELDS
+            ])
+        return rows
+
+    def copy(self, cursor, rows):
+        '''Copy staging rows into the staging table.'''
+        buffer = io.StringIO()
+        # `None` is written as an empty field, which COPY reads as NULL;
+        # validated text fields are never empty.
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor.copy_expert(COPY_STAGING, buffer)
+
+    def run(self, records, dry_run=False):
+        '''Import `records` and return how many events were created.'''
+        records = iter(records)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING)
+            while True:
+                chunk = list(islice(records, self.chunk_size))
+                if not chunk:
+                    break
+                rows = self.validate(chunk)
+                if rows:
+                    self.copy(cursor, rows)
+
+            cursor.execute(INSERT_EVENTS, [self.owner.pk])
+            imported = cursor.rowcount
+            cursor.execute(f'DROP TABLE {STAGING_TABLE}')
+            if dry_run:
+                transaction.set_rollback(True)
+            elif imported:
+                transaction.on_commit(event_cache.bump)
+
+        return imported
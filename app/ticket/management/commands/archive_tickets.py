@@ -0,0 +1,34 @@
+'''
+Django command to archive the tickets of past events.
+'''
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Ticket
+
+
+class Command(BaseCommand):
+    '''Django command to move tickets of ended events to the archive.'''
+    help = (
+        'Move tickets of events that have ended to the archive table in '
+        'batches. With --interval, keep archiving until interrupted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Seconds to wait between runs; run once if omitted.',
+        )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        while True:
+            archived = Ticket.objects.archive_past(
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(f'Archived {archived} tickets.')
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,81 @@
+'''
+Django command to compare the list serializers on large result sets.
+'''
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core import factories
+from core.models import Event, Ticket
+from ticket.fieldsets import RowSerializer
+from ticket.serializers import EventSerializer, TicketSerializer
+
+
+def best_of(repeat, func):
+    '''Return the fastest of `repeat` runs of `func`, in milliseconds.'''
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+class Command(BaseCommand):
+    '''Django command to benchmark model and row serializers.'''
+    help = (
+        'Seed a throwaway test database and time serializing large ticket '
+        'and event lists with the model serializers, the row serializer '
+        'and a sparse fieldset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+        )
+        try:
+            users = factories.create_users(10)
+            events = factories.create_events(users, options['rows'])
+            factories.create_tickets(users, events, options['rows'])
+            for label, func in self.get_cases(options['rows']):
+                elapsed = best_of(options['repeat'], func)
+                self.stdout.write(f'{label:<32} {elapsed:>10.2f} ms')
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def get_cases(self, count):
+        '''Return `(label, callable)` pairs serializing `count` rows.'''
+        tickets = Ticket.objects.order_by('-created_at', '-id')[:count]
+        events = Event.objects.order_by('started_at', 'id')[:count]
+
+        def model_list(serializer_class, queryset):
+            return lambda: serializer_class(queryset.all(), many=True).data
+
+        def row_list(serializer_class, queryset, fields=None):
+            rows = RowSerializer(serializer_class, fields)
+            return lambda: rows.to_representation(
+                queryset.values(*rows.columns)
+            )
+
+        return (
+            ('tickets, model serializer', model_list(
+                TicketSerializer, tickets,
+            )),
+            ('tickets, row serializer', row_list(TicketSerializer, tickets)),
+            ('tickets, fields=id,price', row_list(
+                TicketSerializer, tickets, ('id', 'price'),
+            )),
+            ('events, model serializer', model_list(
+                EventSerializer, events,
+            )),
+            ('events, row serializer', row_list(EventSerializer, events)),
+            ('events, fields=id,name,started_at', row_list(
+                EventSerializer, events, ('id', 'name', 'started_at'),
+            )),
+        )
@@ -0,0 +1,95 @@
+'''
+Django command to EXPLAIN the viewset querysets and reject bad plans.
+'''
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ticket.urls import router
+
+
+class Command(BaseCommand):
+    '''Django command to check the query plans of the API querysets.'''
+    help = (
+        'Run EXPLAIN on the list and retrieve querysets of every registered '
+        'viewset and fail if a plan contains a forbidden node.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forbid',
+            action='append',
+            dest='forbidden',
+            help='Plan node to reject (default: "Seq Scan"). Repeatable.',
+        )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        forbidden = options['forbidden'] or ['Seq Scan']
+        failures = []
+
+        for label, queryset in self.get_querysets():
+            plan = self.explain(queryset)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{label}:\n{plan}\n')
+
+            found = [node for node in forbidden if node in plan]
+            if found:
+                failures.append(f'{label}: {", ".join(found)}')
+                self.stdout.write(self.style.ERROR(f'{label}: {plan}'))
+            else:
+                self.stdout.write(f'{label}: OK')
+
+        if failures:
+            raise CommandError(
+                'Forbidden plan nodes found in ' + '; '.join(failures)
+            )
+
+        self.stdout.write(self.style.SUCCESS('All query plans OK!'))
+
+    def get_querysets(self):
+        '''Yield `(label, queryset)` for each viewset action.'''
+        user = get_user_model()(pk=0)
+        for prefix, viewset, basename in router.registry:
+            for action in ('list', 'retrieve'):
+                if not hasattr(viewset, action):
+                    continue
+
+                view = self.build_view(viewset, action, user)
+                queryset = view.get_queryset()
+                if action == 'retrieve':
+                    queryset = queryset.filter(pk=0)
+                else:
+                    queryset = self.paginate(view, queryset)
+
+                yield f'{basename}-{action}', queryset
+
+    def build_view(self, viewset, action, user):
+        '''Return a viewset instance set up for `action`.'''
+        request = Request(APIRequestFactory().get('/'))
+        request.user = user
+        view = viewset(action=action, request=request, format_kwarg=None)
+        view.kwargs = {}
+        view.args = ()
+        return view
+
+    def paginate(self, view, queryset):
+        '''Apply the ordering and limit the paginator would use.'''
+        paginator = view.paginator
+        if paginator is None:
+            return queryset
+
+        ordering = getattr(paginator, 'ordering', None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset[:paginator.page_size + 1]
+
+    def explain(self, queryset):
+        '''Return the query plan with sequential scans discouraged.'''
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
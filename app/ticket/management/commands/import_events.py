@@ -0,0 +1,97 @@
+'''
+Django command to bulk import events from CSV or NDJSON files.
+'''
+import csv
+import os
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ticket.imports import EventImporter, csv_records, ndjson_records
+
+READERS = {
+    'csv': csv_records,
+    'ndjson': ndjson_records,
+}
+
+
+class Command(BaseCommand):
+    '''Django command to load an event catalogue with COPY.'''
+    help = (
+        'Import events from a CSV file with a header row or an NDJSON file. '
+        'Valid rows are loaded through a COPY staging table in one '
+        'transaction; invalid rows are skipped and reported.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for stdin.')
+        parser.add_argument(
+            '--owner', required=True,
+            help='Email of the user owning the imported events.',
+        )
+        parser.add_argument(
+            '--format', choices=sorted(READERS), default=None,
+            help='File format; guessed from the extension if omitted.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Validate and load the rows, then roll back.',
+        )
+        parser.add_argument(
+            '--report', default=None,
+            help='Write rejected rows as CSV to this file instead of '
+                 'stderr.',
+        )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        path = options['path']
+        file_format = options['format']
+        if file_format is None:
+            file_format = os.path.splitext(path)[1].lstrip('.').lower()
+            if file_format not in READERS:
+                raise CommandError(
+                    'Cannot guess the format, pass --format csv or ndjson.'
+                )
+
+        try:
+            owner = get_user_model().objects.get(email=options['owner'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["owner"]}.')
+
+        importer = EventImporter(owner, chunk_size=options['chunk_size'])
+        if path == '-':
+            imported = importer.run(
+                READERS[file_format](sys.stdin), options['dry_run'],
+            )
+        else:
+            with open(path, newline='', encoding='utf-8') as stream:
+                imported = importer.run(
+                    READERS[file_format](stream), options['dry_run'],
+                )
+
+        self.write_report(importer.errors, options['report'])
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(
+            f'{verb} {imported} events, rejected '
+            f'{len({line for line, _, _ in importer.errors})} rows.'
+        )
+
+    def write_report(self, errors, path):
+        '''Write the rejected rows as `line,field,error` CSV.'''
+        if not errors:
+            return
+        if path is None:
+            self.write_errors(self.stderr, errors)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as stream:
+                self.write_errors(stream, errors)
+
+    @staticmethod
+    def write_errors(stream, errors):
+        '''Write `errors` to `stream` as CSV with a header.'''
+        writer = csv.writer(stream)
+        writer.writerow(('line', 'field', 'error'))
+        writer.writerows(errors)
@@ -0,0 +1,34 @@
+'''
+Django command to release expired seat holds.
+'''
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Hold
+
+
+class Command(BaseCommand):
+    '''Django command to give the seats of expired holds back.'''
+    help = (
+        'Delete expired seat holds in batches and return their seats to '
+        'the events. With --interval, keep sweeping until interrupted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Seconds to wait between sweeps; sweep once if omitted.',
+        )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command.'''
+        while True:
+            released = Hold.objects.release_expired(
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(f'Released {released} expired holds.')
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,257 @@
+'''
+Pagination classes for the ticket APIs.
+'''
+from base64 import b64decode, b64encode
+from types import SimpleNamespace
+from urllib import parse
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import BooleanField, F, Func, Value
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class RowComparison(Func):
+    '''
+    SQL row comparison `(a, b) < (x, y)` of expressions against values.
+
+    Unlike the equivalent `a < x OR (a = x AND b < y)`, Postgres uses a
+    row comparison as an index range on a `(a, b)` index.
+    '''
+    output_field = BooleanField()
+    operators = {'lt': '<', 'gt': '>'}
+
+    def __init__(self, expressions, values, lookup):
+        self.operator = self.operators[lookup]
+        super().__init__(*expressions, *values)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        '''Compile both sides into `(...) <op> (...)`.'''
+        sql_parts, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            sql_parts.append(sql)
+            params.extend(expression_params)
+        half = len(sql_parts) // 2
+        sql = '(%s) %s (%s)' % (
+            ', '.join(sql_parts[:half]),
+            self.operator,
+            ', '.join(sql_parts[half:]),
+        )
+        return sql, params
+
+
+class KeysetPagination(BasePagination):
+    '''
+    Keyset (seek) pagination over a `(field, id)` pair.
+
+    Each page is fetched with `WHERE (field, id) > (last_field, last_id)`
+    and a `LIMIT`, so deep pages cost the same as the first one. Both
+    fields of `ordering` must sort in the same direction. Clients that
+    send `limit` or `offset` get classic limit/offset pagination.
+    '''
+    ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    invalid_cursor_message = _('Invalid cursor')
+    offset_pagination_class = LimitOffsetPagination
+
+    def __init__(self):
+        self.offset_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        '''Return a single page of results, or `None` if disabled.'''
+        if self.use_offset_pagination(request):
+            self.offset_paginator = self.offset_pagination_class()
+            self.offset_paginator.max_limit = self.max_page_size
+            return self.offset_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.field_name = self.ordering[0].lstrip('-')
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.descending = self.ordering[0].startswith('-')
+
+        position, reverse = self.decode_cursor(request)
+        if reverse:
+            order = [self._invert(field) for field in self.ordering]
+        else:
+            order = list(self.ordering)
+        queryset = queryset.order_by(*order)
+
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        if reverse:
+            self.has_previous = has_more
+            self.has_next = position is not None
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        '''Wrap a page of serialized data with navigation links.'''
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_paginated_response(data)
+
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        '''Describe the paginated response for the API docs.'''
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        '''Describe the pagination query parameters for the API docs.'''
+        parameters = [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+        offset_paginator = self.offset_pagination_class()
+        return parameters + offset_paginator.get_schema_operation_parameters(
+            view
+        )
+
+    def use_offset_pagination(self, request):
+        '''Return whether the client asked for limit/offset pagination.'''
+        offset_paginator = self.offset_pagination_class
+        return (
+            offset_paginator.limit_query_param in request.query_params or
+            offset_paginator.offset_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        '''Return the page size, honouring the `page_size` parameter.'''
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def seek_filter(self, position, reverse):
+        '''Return the filter selecting rows after the cursor position.'''
+        value, pk = position
+        after = self.descending == reverse
+        lookup = 'gt' if after else 'lt'
+        return RowComparison(
+            [F(self.field_name), F('id')],
+            [Value(value, output_field=self.field), Value(pk)],
+            lookup,
+        )
+
+    def get_next_link(self):
+        '''Return the link to the following page.'''
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        '''Return the link to the preceding page.'''
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        '''Return the `((value, id), reverse)` encoded in the request.'''
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            value = self.field.to_python(tokens['v'][0])
+            pk = int(tokens['id'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (
+            KeyError, IndexError, TypeError, ValueError,
+            UnicodeError, DjangoValidationError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return (value, pk), reverse
+
+    def encode_cursor(self, instance, reverse):
+        '''Return a URL pointing at the position of `instance`.'''
+        if isinstance(instance, dict):
+            # A `.values()` row rather than a model instance.
+            instance = SimpleNamespace(**{
+                self.field.attname: instance[self.field_name],
+                'pk': instance['id'],
+            })
+        value = self.field.value_to_string(instance)
+        tokens = {'v': value, 'id': instance.pk}
+        if reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def _invert(field):
+        '''Flip the direction of an ordering expression.'''
+        return field[1:] if field.startswith('-') else '-' + field
+
+
+class TicketPagination(KeysetPagination):
+    '''Newest tickets first, keyed on `(created_at, id)`.'''
+    ordering = ('-created_at', '-id')
+
+
+class EventPagination(KeysetPagination):
+    '''Events in chronological order, keyed on `(started_at, id)`.'''
+    ordering = ('started_at', 'id')
@@ -1,9 +1,12 @@
 '''
 Serializers for Ticket APIs
 '''
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 
-from core.models import Ticket, Event
+from core.models import Ticket, Event, Hold, SoldOut
 
 
 class TicketSerializer(serializers.ModelSerializer):
@@ -14,6 +17,56 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = ('id', 'event', 'price', 'paid', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at', 'paid_at')
 
+    def create(self, validated_data):
+        '''Create a ticket, taking a seat from its event.'''
+        try:
+            return Ticket.objects.purchase(**validated_data)
+        except SoldOut:
+            raise serializers.ValidationError(
+                {'event': 'This event is sold out.'},
+                code='sold_out',
+            )
+
+    def update(self, instance, validated_data):
+        '''
+        Update a ticket, keeping its event's counters in step. The row is
+        locked and re-read first, so concurrent updates move seats and
+        payments from the ticket's current state.
+        '''
+        try:
+            with transaction.atomic():
+                instance = Ticket.objects.select_for_update().filter(
+                    pk=instance.pk,
+                ).first()
+                if instance is None:
+                    raise NotFound()
+                old_event = Event(pk=instance.event_id)
+                old_paid, old_price = instance.paid, instance.price
+                event = validated_data.get('event', old_event)
+
+                if event.pk != old_event.pk:
+                    event.reserve_seats()
+                    old_event.release_seats()
+
+                ticket = super().update(instance, validated_data)
+
+                changed = (
+                    event.pk != old_event.pk or
+                    ticket.paid != old_paid or
+                    ticket.price != old_price
+                )
+                if changed and old_paid:
+                    old_event.schedule_payments(-1, -old_price)
+                if changed and ticket.paid:
+                    event.schedule_payments(1, ticket.price)
+        except SoldOut:
+            raise serializers.ValidationError(
+                {'event': 'This event is sold out.'},
+                code='sold_out',
+            )
+
+        return ticket
+
 
 class TicketDetailSerializer(TicketSerializer):
     '''Serializer for ticket detail objects.'''
@@ -22,6 +75,70 @@ class TicketDetailSerializer(TicketSerializer):
         fields = TicketSerializer.Meta.fields + ('paid_at',)
 
 
+class BulkTicketItemSerializer(serializers.ModelSerializer):
+    '''Serializer for one purchase of a bulk request.'''
+    event = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Ticket
+        fields = ('event', 'price')
+
+
+class BulkPurchaseSerializer(serializers.Serializer):
+    '''Serializer for a bulk ticket purchase request.'''
+    MODE_ATOMIC = 'atomic'
+    MODE_PARTIAL = 'partial'
+
+    mode = serializers.ChoiceField(
+        choices=(MODE_ATOMIC, MODE_PARTIAL),
+        default=MODE_ATOMIC,
+    )
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        min_length=1,
+        max_length=500,
+    )
+
+
+class HoldSerializer(serializers.ModelSerializer):
+    '''Serializer for seat holds.'''
+    quantity = serializers.IntegerField(min_value=1, max_value=20, default=1)
+
+    class Meta:
+        model = Hold
+        fields = ('id', 'event', 'quantity', 'price', 'expires_at')
+        read_only_fields = ('id', 'expires_at')
+
+    def create(self, validated_data):
+        '''Hold seats, taking them from the event until paid or expired.'''
+        try:
+            return Hold.objects.hold(**validated_data)
+        except SoldOut:
+            raise serializers.ValidationError(
+                {'event': 'This event is sold out.'},
+                code='sold_out',
+            )
+
+
+class OwnerSerializer(serializers.ModelSerializer):
+    '''Public details of an event's owner.'''
+
+    class Meta:
+        model = get_user_model()
+        fields = ('id', 'name')
+        read_only_fields = fields
+
+
+class EventStatsSerializer(serializers.ModelSerializer):
+    '''Serializer for event sales statistics.'''
+    paid = serializers.IntegerField(source='paid_count')
+
+    class Meta:
+        model = Event
+        fields = ('id', 'capacity', 'sold', 'paid', 'revenue')
+        read_only_fields = fields
+
+
 class EventSerializer(serializers.ModelSerializer):
     '''Serializer for event objects.'''
     class Meta:
@@ -33,7 +150,18 @@ class EventSerializer(serializers.ModelSerializer):
             'description',
             'duration_hours',
             'started_at',
+            'capacity',
+            'sold',
             'created_at',
             'updated_at'
         )
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'sold', 'created_at', 'updated_at')
+
+
+class UpcomingEventSerializer(EventSerializer):
+    '''Serializer for an upcoming event with the user's ticket count.'''
+    tickets = serializers.IntegerField(source='ticket_count', read_only=True)
+
+    class Meta(EventSerializer.Meta):
+        fields = EventSerializer.Meta.fields + ('tickets',)
+        read_only_fields = fields
@@ -0,0 +1,18 @@
+'''
+Signal handlers for the ticket APIs.
+'''
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Event
+from ticket.caching import event_cache
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_cache(sender, **kwargs):
+    '''Drop cached catalogue pages when an event changes.'''
+    event_cache.bump()
+    # Bump again after commit so readers cannot re-cache pre-commit data.
+    transaction.on_commit(event_cache.bump)
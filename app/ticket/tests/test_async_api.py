@@ -0,0 +1,268 @@
+'''
+Tests for the async read APIs.
+'''
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import AsyncClient, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+
+from core.authentication import (
+    CachedTokenAuthentication,
+    TokenCache,
+    token_cache,
+)
+from core.models import AuthToken, Ticket, Event
+from ticket.caching import ResponseCache
+
+TICKET_URL = reverse('ticket:async-ticket-list')
+EVENT_URL = reverse('ticket:async-event-list')
+ME_URL = reverse('user:async-me')
+
+
+def detail_url(ticket_id):
+    '''Create and return async ticket detail URL.'''
+    return reverse('ticket:async-ticket-detail', args=[ticket_id])
+
+
+def in_event_loop():
+    '''Return whether the caller runs on an event loop.'''
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+# Worker threads must not keep connections to the test database.
+@patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 0})
+class AsyncApiTests(TransactionTestCase):
+    '''Test the async ticket, event and user endpoints.'''
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.token = AuthToken.objects.issue(self.user)
+        self.client = AsyncClient()
+        self.event = create_event(self.user)
+
+    def request(self, method, url, **headers):
+        '''Send a request through the async client.'''
+        async def send():
+            return await getattr(self.client, method)(url, **headers)
+
+        return async_to_sync(send)()
+
+    def get(self, url, **headers):
+        '''Send an authenticated GET request.'''
+        headers['authorization'] = f'Token {self.token.key}'
+        return self.request('get', url, **headers)
+
+    def test_auth_required(self):
+        '''Test a request without a token is rejected.'''
+        for url in (TICKET_URL, EVENT_URL, ME_URL):
+            res = self.request('get', url)
+
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+    def test_invalid_token_rejected(self):
+        '''Test an unknown token is rejected.'''
+        res = self.request('get', TICKET_URL, authorization='Token invalid')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_tickets(self):
+        '''Test the list matches the sync endpoint and is user limited.'''
+        other = create_user(email='other@example.com', password='pass123')
+        Ticket.objects.create(owner=other, event=self.event, price=5)
+        ticket = Ticket.objects.create(
+            owner=self.user, event=self.event, price=Decimal('10.00'),
+        )
+
+        res = self.get(TICKET_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['id'], ticket.id)
+        self.assertEqual(results[0]['price'], '10.00')
+
+    def test_list_tickets_paginated(self):
+        '''Test the cursor links of the sync endpoint are reused.'''
+        for _ in range(3):
+            Ticket.objects.create(owner=self.user, event=self.event, price=5)
+
+        res = self.get(f'{TICKET_URL}?page_size=2')
+        next_url = res.json()['next']
+        res = self.get(next_url)
+
+        self.assertEqual(len(res.json()['results']), 1)
+        self.assertIsNone(res.json()['next'])
+
+    def test_invalid_cursor(self):
+        '''Test an invalid cursor is answered with a 404 error.'''
+        res = self.get(f'{TICKET_URL}?cursor=invalid')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('detail', res.json())
+
+    def test_ticket_detail(self):
+        '''Test retrieving one of the user's tickets.'''
+        ticket = Ticket.objects.create(
+            owner=self.user, event=self.event, price=5,
+        )
+
+        res = self.get(detail_url(ticket.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['id'], ticket.id)
+        self.assertIn('paid_at', res.json())
+
+    def test_other_users_ticket_not_found(self):
+        '''Test another user's ticket is not found.'''
+        other = create_user(email='other@example.com', password='pass123')
+        ticket = Ticket.objects.create(owner=other, event=self.event, price=5)
+
+        res = self.get(detail_url(ticket.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_writes_not_allowed(self):
+        '''Test the async endpoints are read only.'''
+        res = self.request(
+            'post', TICKET_URL, authorization=f'Token {self.token.key}',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_event_list_cached(self):
+        '''Test events are cached and revalidated with their ETag.'''
+        res = self.get(EVENT_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['results'][0]['id'], self.event.id)
+
+        res = self.get(EVENT_URL, **{'if-none-match': res['ETag']})
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_archived_tickets(self):
+        '''Test archived tickets are listed on request and retrievable.'''
+        past = create_event(
+            self.user,
+            started_at=timezone.now() - timedelta(days=1),
+            duration_hours=1,
+        )
+        ticket = Ticket.objects.create(owner=self.user, event=past, price=5)
+        Ticket.objects.archive_past()
+
+        res = self.get(detail_url(ticket.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['id'], ticket.id)
+
+        res = self.get(TICKET_URL)
+        self.assertEqual(res.json()['results'], [])
+        res = self.get(f'{TICKET_URL}?include_past=true')
+        ids = [item['id'] for item in res.json()['results']]
+        self.assertEqual(ids, [ticket.id])
+
+    def test_event_list_filtered(self):
+        '''Test the event list filters apply and are cached separately.'''
+        other = create_user(email='other@example.com', password='pass123')
+        event = create_event(other)
+        self.get(EVENT_URL)
+
+        res = self.get(f'{EVENT_URL}?owner={other.id}')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [item['id'] for item in res.json()['results']]
+        self.assertEqual(ids, [event.id])
+
+    def test_invalid_params_rejected(self):
+        '''Test invalid filters and sync-only parameters get a 400.'''
+        for url in (
+            f'{EVENT_URL}?started_after=soon',
+            f'{EVENT_URL}?fields=id',
+            f'{TICKET_URL}?expand=event',
+            f'{TICKET_URL}?include_past=maybe',
+        ):
+            res = self.get(url)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.get(f'{EVENT_URL}?fields=id')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.json())
+
+    def test_shared_caches_read_off_the_loop(self):
+        '''Test shared cache lookups never block the event loop.'''
+        reads = []
+        get = LocMemCache.get
+
+        def recorded_get(backend, *args, **kwargs):
+            reads.append(in_event_loop())
+            return get(backend, *args, **kwargs)
+
+        shared = TokenCache(shared_cache='default')
+        with patch.object(LocMemCache, 'get', recorded_get), \
+                patch.object(CachedTokenAuthentication, 'cache', shared), \
+                patch.object(ResponseCache, 'in_process', False):
+            for _ in range(2):
+                res = self.get(EVENT_URL)
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertTrue(reads)
+        self.assertNotIn(True, reads)
+
+    def test_me(self):
+        '''Test retrieving the authenticated user.'''
+        res = self.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {
+            'email': self.user.email,
+            'name': self.user.name,
+        })
+
+    def test_me_served_from_token_cache(self):
+        '''Test a cached token authenticates without a database query.'''
+        self.get(ME_URL)
+
+        res = self.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.asgi_request.query_stats.count, 0)
+
+    def test_queries_counted(self):
+        '''Test queries run in worker threads count towards the request.'''
+        res = self.get(TICKET_URL)
+
+        self.assertGreater(res.asgi_request.query_stats.count, 0)
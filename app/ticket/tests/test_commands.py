@@ -0,0 +1,47 @@
+'''
+Test the ticket management commands.
+'''
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+
+class CheckQueryPlansTests(TestCase):
+    '''Test the check_query_plans command.'''
+
+    def test_viewset_plans_use_indexes(self):
+        '''Test no viewset queryset needs a sequential scan.'''
+        out = StringIO()
+
+        call_command('check_query_plans', stdout=out)
+
+        self.assertIn('ticket-list: OK', out.getvalue())
+        self.assertIn('event-list: OK', out.getvalue())
+
+    def test_forbidden_node_fails(self):
+        '''Test a plan containing a forbidden node raises an error.'''
+        with self.assertRaises(CommandError):
+            call_command('check_query_plans', forbid=['Limit'],
+                         stdout=StringIO())
+
+
+@patch.object(connection.creation, 'destroy_test_db')
+@patch.object(connection.creation, 'create_test_db')
+class BenchmarkSerializersTests(TestCase):
+    '''Test the serializer benchmark command.'''
+
+    def test_reports_each_case(self, patched_create, patched_destroy):
+        '''Test a timing is reported for every serializer case.'''
+        out = StringIO()
+
+        call_command('benchmark_serializers', rows=5, repeat=1, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 6)
+        for line in lines:
+            self.assertIn(' ms', line)
+        patched_destroy.assert_called_once()
@@ -0,0 +1,263 @@
+'''
+Tests for conditional requests on the ticket and event APIs.
+'''
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ticket, Event
+
+TICKET_URL = reverse('ticket:ticket-list')
+
+
+def ticket_url(ticket_id):
+    '''Create and return ticket detail URL.'''
+    return reverse('ticket:ticket-detail', args=[ticket_id])
+
+
+def event_url(event_id):
+    '''Create and return event detail URL.'''
+    return reverse('ticket:event-detail', args=[event_id])
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class ConditionalTicketApiTests(TestCase):
+    '''Test conditional requests on tickets.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.client.force_authenticate(self.user)
+        self.event = create_event(self.user)
+        self.ticket = Ticket.objects.create(
+            owner=self.user, event=self.event, price=5,
+        )
+
+    def test_retrieve_not_modified(self):
+        '''Test a current ETag is answered with 304 in one query.'''
+        res = self.client.get(ticket_url(self.ticket.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', res)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                ticket_url(self.ticket.id), HTTP_IF_NONE_MATCH=res['ETag'],
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+
+    def test_retrieve_modified_since(self):
+        '''Test `If-Modified-Since` is answered from `updated_at`.'''
+        later = http_date((timezone.now() + timedelta(hours=1)).timestamp())
+        earlier = http_date((timezone.now() - timedelta(hours=1)).timestamp())
+
+        res = self.client.get(
+            ticket_url(self.ticket.id), HTTP_IF_MODIFIED_SINCE=later,
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        res = self.client.get(
+            ticket_url(self.ticket.id), HTTP_IF_MODIFIED_SINCE=earlier,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_after_change(self):
+        '''Test a change gives the ticket a new ETag.'''
+        etag = self.client.get(ticket_url(self.ticket.id))['ETag']
+        self.ticket.pay()
+
+        res = self.client.get(
+            ticket_url(self.ticket.id), HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertTrue(res.data['paid'])
+
+    def test_other_users_ticket_not_found(self):
+        '''Test another user's ticket is not answered with 304.'''
+        other = create_user(email='other@example.com', password='pass123')
+        ticket = Ticket.objects.create(owner=other, event=self.event, price=5)
+
+        res = self.client.get(ticket_url(ticket.id), HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_not_modified(self):
+        '''Test an unchanged list is answered with 304 in one query.'''
+        etag = self.client.get(TICKET_URL)['ETag']
+
+        with self.assertNumQueries(1):
+            res = self.client.get(TICKET_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_per_page(self):
+        '''Test each page and query string has its own ETag.'''
+        Ticket.objects.create(owner=self.user, event=self.event, price=5)
+        first = self.client.get(TICKET_URL, {'page_size': 1})
+        second = self.client.get(first.data['next'])
+        fields = self.client.get(TICKET_URL, {'page_size': 1, 'fields': 'id'})
+
+        etags = {first['ETag'], second['ETag'], fields['ETag']}
+        self.assertEqual(len(etags), 3)
+        res = self.client.get(
+            first.data['next'], HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_follows_navigation(self):
+        '''Test a page gaining a next page gets a new ETag.'''
+        etag = self.client.get(TICKET_URL, {'page_size': 1})['ETag']
+        Ticket.objects.create(owner=self.user, event=self.event, price=5)
+        Ticket.objects.filter(pk=self.ticket.pk).update(
+            created_at=timezone.now() + timedelta(hours=1),
+        )
+
+        res = self.client.get(
+            TICKET_URL, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_list_after_delete(self):
+        '''Test deleting a ticket changes the list's ETag.'''
+        Ticket.objects.create(owner=self.user, event=self.event, price=5)
+        etag = self.client.get(TICKET_URL)['ETag']
+        Ticket.objects.filter(pk=self.ticket.pk).delete()
+
+        res = self.client.get(TICKET_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_list_expanded_event_change(self):
+        '''Test changing an expanded event changes the list's ETag.'''
+        url = f'{TICKET_URL}?expand=event'
+        etag = self.client.get(url)['ETag']
+        Event.objects.filter(pk=self.event.pk).update(
+            name='Renamed', updated_at=timezone.now(),
+        )
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['event']['name'], 'Renamed')
+
+    def test_list_expanded_owner_change(self):
+        '''Test renaming an expanded event owner changes the list's ETag.'''
+        url = f'{TICKET_URL}?expand=event.owner'
+        etag = self.client.get(url)['ETag']
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            name='Renamed',
+        )
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        owner = res.data['results'][0]['event']['owner']
+        self.assertEqual(owner['name'], 'Renamed')
+
+    def test_update_if_match(self):
+        '''Test an update with the current ETag succeeds.'''
+        etag = self.client.get(ticket_url(self.ticket.id))['ETag']
+
+        res = self.client.patch(
+            ticket_url(self.ticket.id), {'price': '7.00'}, HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        res = self.client.get(
+            ticket_url(self.ticket.id), HTTP_IF_NONE_MATCH=res['ETag'],
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_stale_if_match(self):
+        '''Test an update based on a stale copy is rejected.'''
+        etag = self.client.get(ticket_url(self.ticket.id))['ETag']
+        self.client.patch(ticket_url(self.ticket.id), {'price': '6.00'})
+
+        res = self.client.patch(
+            ticket_url(self.ticket.id), {'price': '7.00'}, HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.ticket.refresh_from_db()
+        self.assertEqual(str(self.ticket.price), '6.00')
+
+    def test_delete_stale_if_match(self):
+        '''Test deleting based on a stale copy is rejected.'''
+        res = self.client.delete(
+            ticket_url(self.ticket.id), HTTP_IF_MATCH='"stale"',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(Ticket.objects.filter(pk=self.ticket.pk).exists())
+
+
+class ConditionalEventApiTests(TestCase):
+    '''Test conditional requests on events.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.client.force_authenticate(self.user)
+        self.event = create_event(self.user, capacity=10)
+
+    def test_retrieve_event(self):
+        '''Test retrieving an event with its validators.'''
+        res = self.client.get(event_url(self.event.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], self.event.id)
+        self.assertIn('ETag', res)
+
+    def test_seat_sale_changes_etag(self):
+        '''Test selling a seat changes the event's ETag.'''
+        etag = self.client.get(event_url(self.event.id))['ETag']
+        res = self.client.get(
+            event_url(self.event.id), HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.event.reserve_seats()
+        res = self.client.get(
+            event_url(self.event.id), HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['sold'], 1)
+
+    def test_events_not_writable(self):
+        '''Test the event detail stays read only.'''
+        res = self.client.patch(event_url(self.event.id), {'name': 'New'})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -53,10 +53,10 @@ def PrivateEventsApiTests(TestCase):
 
         res = self.client.get(EVENTS_URL)
 
-        events = Event.objects.all().order_by('-created_at')
+        events = Event.objects.all().order_by('started_at', 'id')
         serializer = EventSerializer(events, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_event_limited_to_owner(self):
         '''Test retrieving events for owner.'''
@@ -79,6 +79,6 @@ def PrivateEventsApiTests(TestCase):
         res = self.client.get(EVENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], event.name)
-        self.assertEqual(res.data[0]['id'], event.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], event.name)
+        self.assertEqual(res.data['results'][0]['id'], event.id)
@@ -0,0 +1,80 @@
+'''
+Tests for caching the event catalogue.
+'''
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event
+
+EVENTS_URL = reverse('ticket:event-list')
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class EventCacheTests(TestCase):
+    '''Test the cached event list.'''
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='testpass1')
+        self.client.force_authenticate(self.user)
+        self.event = create_event(user=self.user)
+
+    def test_second_request_served_from_cache(self):
+        '''Test a repeated list does not query events again.'''
+        first = self.client.get(EVENTS_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(EVENTS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_not_modified(self):
+        '''Test a matching If-None-Match returns 304.'''
+        etag = self.client.get(EVENTS_URL)['ETag']
+
+        res = self.client.get(EVENTS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(res.content)
+
+    def test_event_change_invalidates(self):
+        '''Test saving or deleting an event refreshes the list.'''
+        etag = self.client.get(EVENTS_URL)['ETag']
+
+        self.event.name = 'Renamed'
+        self.event.save()
+        res = self.client.get(EVENTS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['name'], 'Renamed')
+
+        self.event.delete()
+        res = self.client.get(EVENTS_URL)
+
+        self.assertEqual(res.data['results'], [])
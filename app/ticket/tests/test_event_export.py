@@ -0,0 +1,247 @@
+'''
+Tests for exporting event tickets.
+'''
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.exceptions import SynchronousOnlyOperation
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.concurrency import StreamingASGIHandler
+from core.models import AuthToken, Ticket, Event
+
+
+def export_url(event_id):
+    '''Create and return event export URL.'''
+    return reverse('ticket:event-export', args=[event_id])
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+def read_body(response):
+    '''Return the streamed body of a response.'''
+    return b''.join(response.streaming_content)
+
+
+class EventExportApiTests(TestCase):
+    '''Test the event export endpoint.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass1',
+            name='Test User',
+        )
+        self.client.force_authenticate(self.user)
+        self.event = create_event(user=self.user)
+        self.tickets = [
+            Ticket.objects.create(
+                event=self.event,
+                owner=self.user,
+                price=Decimal('10.00'),
+            )
+            for _ in range(3)
+        ]
+
+    def test_export_csv(self):
+        '''Test exporting tickets as CSV.'''
+        res = self.client.get(export_url(self.event.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(read_body(res).decode())))
+        self.assertEqual(rows[0][0], 'ticket_id')
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]],
+            [ticket.id for ticket in self.tickets],
+        )
+        self.assertEqual(rows[1][1], self.user.email)
+
+    def test_export_ndjson_after_id(self):
+        '''Test resuming an NDJSON export after a ticket id.'''
+        params = {'output': 'ndjson', 'after': self.tickets[0].id}
+
+        res = self.client.get(export_url(self.event.id), params)
+
+        lines = read_body(res).decode().splitlines()
+        ids = [json.loads(line)['ticket_id'] for line in lines]
+        self.assertEqual(ids, [ticket.id for ticket in self.tickets[1:]])
+
+    def test_export_negotiated_by_accept(self):
+        '''Test the output format follows the Accept header.'''
+        res = self.client.get(
+            export_url(self.event.id),
+            HTTP_ACCEPT='application/x-ndjson',
+        )
+
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(read_body(res).decode().splitlines()), 3)
+
+    def test_export_gzip(self):
+        '''Test the export is compressed when the client accepts gzip.'''
+        res = self.client.get(
+            export_url(self.event.id),
+            HTTP_ACCEPT_ENCODING='gzip, deflate',
+        )
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        body = gzip.decompress(read_body(res)).decode()
+        self.assertEqual(len(body.splitlines()), 4)
+
+    def test_export_gzip_refused(self):
+        '''Test gzip is not used when the client refuses it.'''
+        for accept_encoding in ('gzip;q=0, deflate', 'x-gzip', '*;q=0'):
+            with self.subTest(accept_encoding=accept_encoding):
+                res = self.client.get(
+                    export_url(self.event.id),
+                    HTTP_ACCEPT_ENCODING=accept_encoding,
+                )
+
+                self.assertNotIn('Content-Encoding', res)
+                body = read_body(res).decode()
+                self.assertEqual(len(body.splitlines()), 4)
+
+    def test_export_gzip_weighted(self):
+        '''Test gzip is used when accepted with a q value or wildcard.'''
+        for accept_encoding in ('br, GZIP; q=0.5', '*'):
+            with self.subTest(accept_encoding=accept_encoding):
+                res = self.client.get(
+                    export_url(self.event.id),
+                    HTTP_ACCEPT_ENCODING=accept_encoding,
+                )
+
+                self.assertEqual(res['Content-Encoding'], 'gzip')
+
+    def test_export_archived_tickets(self):
+        '''Test tickets moved to the archive are still exported.'''
+        Event.objects.filter(pk=self.event.pk).update(
+            started_at=timezone.now() - timedelta(days=1),
+            duration_hours=1,
+        )
+        self.assertEqual(Ticket.objects.archive_past(), 3)
+
+        res = self.client.get(export_url(self.event.id))
+        rows = list(csv.reader(io.StringIO(read_body(res).decode())))
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]],
+            [ticket.id for ticket in self.tickets],
+        )
+
+        params = {'output': 'ndjson', 'after': self.tickets[1].id}
+        res = self.client.get(export_url(self.event.id), params)
+        lines = read_body(res).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line)['ticket_id'] for line in lines],
+            [self.tickets[2].id],
+        )
+
+    def test_export_limited_to_owner(self):
+        '''Test users cannot export events they do not own.'''
+        other = create_user(email='other@example.com', password='testpass1')
+        event = create_event(user=other)
+
+        res = self.client.get(export_url(event.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+def asgi_get(application, url, token):
+    '''Send a GET through an ASGI application and return its messages.'''
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Token {token}'.encode()),
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async_to_sync(application)(scope, receive, send)
+    return messages
+
+
+# Worker threads must not keep connections to the test database.
+@patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 0})
+class AsgiExportTests(TransactionTestCase):
+    '''Test streaming the export through the ASGI application.'''
+
+    def setUp(self):
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.token = AuthToken.objects.issue(self.user)
+        self.event = create_event(user=self.user)
+        self.tickets = Ticket.objects.bulk_create(
+            Ticket(event=self.event, owner=self.user, price=5)
+            for _ in range(3)
+        )
+
+    def test_export_streams_under_asgi(self):
+        '''Test the export reads the database outside the event loop.'''
+        messages = asgi_get(
+            StreamingASGIHandler(), export_url(self.event.id), self.token.key,
+        )
+
+        self.assertEqual(messages[0]['status'], status.HTTP_200_OK)
+        body = b''.join(
+            message.get('body', b'') for message in messages[1:]
+        )
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]],
+            [ticket.id for ticket in self.tickets],
+        )
+        self.assertNotIn('more_body', messages[-1])
+
+    def test_default_handler_cuts_export_off(self):
+        '''Test Django's own handler reads the export on the loop.'''
+        with self.assertRaises(SynchronousOnlyOperation):
+            asgi_get(
+                ASGIHandler(), export_url(self.event.id), self.token.key,
+            )
@@ -0,0 +1,138 @@
+'''
+Tests for the bulk event import command.
+'''
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.models import Event
+
+CSV_HEADER = 'name,description,started_at,duration_hours,capacity\n'
+
+
+class ImportEventsTests(TestCase):
+    '''Test importing events from CSV and NDJSON files.'''
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='organiser@example.com', password='pass123',
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        '''Write a file to import and return its path.'''
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        '''Run the command and return its output and error output.'''
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_events', path, '--owner', self.user.email, *args,
+            stdout=out, stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        '''Test valid CSV rows become events of the owner.'''
+        path = self.write('events.csv', CSV_HEADER + (
+            'Concert,"Live, loud",2030-01-01T20:00:00Z,3.5,100\n'
+            'Talk,Quiet,2030-01-02T18:00:00Z,1,\n'
+        ))
+
+        out, err = self.run_import(path, '--chunk-size', '1')
+
+        self.assertIn('Imported 2 events, rejected 0 rows.', out)
+        self.assertEqual(err, '')
+        concert, talk = Event.objects.order_by('id')
+        self.assertEqual(concert.owner, self.user)
+        self.assertEqual(concert.description, 'Live, loud')
+        self.assertEqual(concert.duration_hours, Decimal('3.50'))
+        self.assertEqual(concert.capacity, 100)
+        self.assertEqual(concert.sold, 0)
+        self.assertIsNone(talk.capacity)
+        self.assertEqual(
+            Event.objects.filter(description__search='quiet').get(), talk,
+        )
+
+    def test_import_ndjson(self):
+        '''Test NDJSON lines are imported and bad lines reported.'''
+        lines = [
+            json.dumps({
+                'name': 'Concert',
+                'description': 'Live',
+                'started_at': '2030-01-01T20:00:00Z',
+                'duration_hours': 2,
+            }),
+            '',
+            '{not json',
+        ]
+        path = self.write('events.ndjson', '\n'.join(lines) + '\n')
+
+        out, err = self.run_import(path)
+
+        self.assertIn('Imported 1 events, rejected 1 rows.', out)
+        self.assertIn('3,,Invalid record', err)
+        self.assertEqual(Event.objects.get().name, 'Concert')
+
+    def test_invalid_rows_reported(self):
+        '''Test invalid rows are skipped and reported per field.'''
+        path = self.write('events.csv', CSV_HEADER + (
+            'Good,Fine,2030-01-01T20:00:00Z,2,10\n'
+            ',Missing name,2030-01-01T20:00:00Z,2,10\n'
+            'Bad,Bad values,tomorrow,2,-1\n'
+        ))
+        report = os.path.join(self.directory.name, 'report.csv')
+
+        out, _ = self.run_import(path, '--report', report)
+
+        self.assertIn('Imported 1 events, rejected 2 rows.', out)
+        with open(report, encoding='utf-8') as stream:
+            rows = stream.read().splitlines()
+        self.assertEqual(rows[0], 'line,field,error')
+        self.assertEqual(
+            [row.split(',')[:2] for row in rows[1:]],
+            [['3', 'name'], ['4', 'started_at'], ['4', 'capacity']],
+        )
+        self.assertEqual(Event.objects.get().name, 'Good')
+
+    def test_dry_run(self):
+        '''Test a dry run validates and counts without creating events.'''
+        path = self.write('events.csv', CSV_HEADER + (
+            'Concert,Live,2030-01-01T20:00:00Z,3,100\n'
+        ))
+
+        out, _ = self.run_import(path, '--dry-run')
+        self.assertIn('Would import 1 events', out)
+        self.assertFalse(Event.objects.exists())
+
+        out, _ = self.run_import(path)
+        self.assertIn('Imported 1 events', out)
+
+    def test_unknown_owner(self):
+        '''Test importing for an unknown owner fails.'''
+        path = self.write('events.csv', CSV_HEADER)
+
+        with self.assertRaises(CommandError):
+            call_command('import_events', path, '--owner', 'x@example.com')
+
+    def test_unknown_format(self):
+        '''Test a file without a known extension needs --format.'''
+        path = self.write('events.txt', CSV_HEADER)
+
+        with self.assertRaises(CommandError):
+            self.run_import(path)
+        out, _ = self.run_import(path, '--format', 'csv')
+        self.assertIn('Imported 0 events', out)
@@ -0,0 +1,126 @@
+'''
+Tests for filtering and searching the event list.
+'''
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event
+
+EVENTS_URL = reverse('ticket:event-list')
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class EventSearchApiTests(TestCase):
+    '''Test server-side filtering of the event list.'''
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='testpass1')
+        self.client.force_authenticate(self.user)
+        self.now = timezone.now()
+
+    def get_ids(self, **params):
+        '''Return the ids of the listed events.'''
+        res = self.client.get(EVENTS_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [event['id'] for event in res.data['results']]
+
+    def test_filter_by_owner(self):
+        '''Test filtering events by owner.'''
+        other = create_user(email='other@example.com', password='testpass1')
+        event = create_event(self.user)
+        create_event(other)
+
+        self.assertEqual(self.get_ids(owner=self.user.id), [event.id])
+
+    def test_filter_by_start_range(self):
+        '''Test filtering events by a started_at range.'''
+        create_event(self.user, started_at=self.now - timedelta(days=5))
+        inside = create_event(self.user, started_at=self.now)
+        create_event(self.user, started_at=self.now + timedelta(days=5))
+
+        ids = self.get_ids(
+            started_after=(self.now - timedelta(days=1)).isoformat(),
+            started_before=(self.now + timedelta(days=1)).isoformat(),
+        )
+
+        self.assertEqual(ids, [inside.id])
+
+    def test_upcoming_only(self):
+        '''Test only events yet to start are listed.'''
+        create_event(self.user, started_at=self.now - timedelta(hours=1))
+        upcoming = create_event(
+            self.user, started_at=self.now + timedelta(hours=1),
+        )
+
+        self.assertEqual(self.get_ids(upcoming='true'), [upcoming.id])
+
+    def test_full_text_search(self):
+        '''Test searching names and descriptions with stemming.'''
+        by_name = create_event(self.user, name='Jazz concerts')
+        by_description = create_event(
+            self.user,
+            name='Friday night',
+            description='Live jazz concert downtown',
+            started_at=self.now + timedelta(hours=1),
+        )
+        create_event(self.user, name='Rock festival')
+
+        ids = self.get_ids(q='jazz concert')
+
+        self.assertEqual(ids, [by_name.id, by_description.id])
+
+    def test_search_combined_with_filters(self):
+        '''Test search results respect the other filters.'''
+        create_event(
+            self.user, name='Jazz night',
+            started_at=self.now - timedelta(days=1),
+        )
+        upcoming = create_event(
+            self.user, name='Jazz night',
+            started_at=self.now + timedelta(days=1),
+        )
+
+        ids = self.get_ids(q='jazz', upcoming='true')
+
+        self.assertEqual(ids, [upcoming.id])
+
+    def test_invalid_filters(self):
+        '''Test invalid filter values are rejected.'''
+        for params in (
+            {'started_after': 'yesterday'},
+            {'owner': 'me'},
+            {
+                'started_after': self.now.isoformat(),
+                'started_before': (self.now - timedelta(days=1)).isoformat(),
+            },
+        ):
+            res = self.client.get(EVENTS_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,129 @@
+'''
+Tests for the event sales statistics API.
+'''
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ticket, Event, Job
+
+TICKET_URL = reverse('ticket:ticket-list')
+
+
+def stats_url(event_id):
+    '''Create and return event stats URL.'''
+    return reverse('ticket:event-stats', args=[event_id])
+
+
+def detail_url(ticket_id):
+    '''Create and return ticket detail URL.'''
+    return reverse('ticket:ticket-detail', args=[ticket_id])
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class EventStatsApiTests(TestCase):
+    '''Test the event stats endpoint.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='testpass1')
+        self.client.force_authenticate(self.user)
+        self.event = create_event(user=self.user, capacity=10)
+
+    def buy(self, price, paid=False):
+        '''Buy a ticket for the test event.'''
+        return Ticket.objects.purchase(
+            self.event, self.user, price=Decimal(price), paid=paid
+        )
+
+    def test_stats_follow_purchases_and_payments(self):
+        '''Test counters track purchases, payments and deletions.'''
+        first = self.buy('10.00')
+        self.buy('15.00', paid=True)
+        deleted = self.buy('20.00')
+        first.pay()
+        deleted.pay()
+        self.client.delete(detail_url(deleted.id))
+        Job.objects.run_pending()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(stats_url(self.event.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['sold'], 2)
+        self.assertEqual(res.data['paid'], 2)
+        self.assertEqual(Decimal(res.data['revenue']), Decimal('25.00'))
+        self.assertEqual(res.data['capacity'], 10)
+
+    def test_update_adjusts_revenue(self):
+        '''Test changing a paid ticket's price updates revenue.'''
+        ticket = self.buy('10.00', paid=True)
+
+        self.client.patch(detail_url(ticket.id), {'price': '12.50'})
+        Job.objects.run_pending()
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.paid_count, 1)
+        self.assertEqual(self.event.revenue, Decimal('12.50'))
+
+    def test_delete_before_payment_is_counted(self):
+        '''Test deleting a ticket whose payment is still queued.'''
+        ticket = self.buy('10.00')
+        self.client.post(reverse('ticket:ticket-pay', args=[ticket.id]))
+
+        res = self.client.delete(detail_url(ticket.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.paid_count, 0)
+        Job.objects.run_pending()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.paid_count, 0)
+        self.assertEqual(self.event.revenue, Decimal('0.00'))
+        self.assertFalse(Job.objects.exists())
+
+    def test_update_before_payment_is_counted(self):
+        '''Test repricing a ticket whose payment is still queued.'''
+        ticket = self.buy('10.00')
+        self.client.post(reverse('ticket:ticket-pay', args=[ticket.id]))
+
+        res = self.client.patch(detail_url(ticket.id), {'price': '12.50'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        Job.objects.run_pending()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.paid_count, 1)
+        self.assertEqual(self.event.revenue, Decimal('12.50'))
+        self.assertFalse(Job.objects.exists())
+
+    def test_stats_limited_to_owner(self):
+        '''Test other users cannot see an event's stats.'''
+        other = create_user(email='other@example.com', password='testpass1')
+        event = create_event(user=other)
+
+        res = self.client.get(stats_url(event.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,196 @@
+'''
+Tests for sparse fieldsets and the row serializer.
+'''
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ticket, Event
+from ticket.fieldsets import RowSerializer
+from ticket.serializers import EventSerializer, TicketSerializer
+
+TICKET_URL = reverse('ticket:ticket-list')
+EVENTS_URL = reverse('ticket:event-list')
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class RowSerializerTests(TestCase):
+    '''Test rows serialize exactly like model instances.'''
+
+    def setUp(self):
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.event = create_event(self.user, capacity=10)
+        Ticket.objects.create(
+            owner=self.user, event=self.event, price=Decimal('7.5'),
+        )
+        Ticket.objects.create(
+            owner=self.user, event=self.event, price=3, paid=True,
+            paid_at=timezone.now(),
+        )
+
+    def assertSameOutput(self, serializer_class, queryset):
+        rows = RowSerializer(serializer_class)
+        expected = serializer_class(queryset, many=True).data
+
+        data = rows.to_representation(queryset.values(*rows.columns))
+
+        self.assertEqual(data, expected)
+
+    def test_ticket_rows(self):
+        '''Test ticket rows match the ticket serializer.'''
+        self.assertSameOutput(TicketSerializer, Ticket.objects.order_by('id'))
+
+    def test_event_rows(self):
+        '''Test event rows match the event serializer.'''
+        self.assertSameOutput(EventSerializer, Event.objects.order_by('id'))
+
+
+class SparseFieldsetApiTests(TestCase):
+    '''Test narrowing list responses with `?fields=`.'''
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.client.force_authenticate(self.user)
+        self.event = create_event(self.user, description='x' * 10000)
+        self.ticket = Ticket.objects.create(
+            owner=self.user, event=self.event, price=5,
+        )
+
+    def test_ticket_fields(self):
+        '''Test only the requested ticket fields and the id are returned.'''
+        res = self.client.get(TICKET_URL, {'fields': 'price,paid'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'id': self.ticket.id, 'price': '5.00', 'paid': False},
+        ])
+
+    def test_event_fields_narrow_columns(self):
+        '''Test unrequested columns are not selected.'''
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(EVENTS_URL, {'fields': 'name'})
+
+        self.assertEqual(res.data['results'], [
+            {'id': self.event.id, 'name': self.event.name},
+        ])
+        sql = context.captured_queries[-1]['sql']
+        self.assertIn('"core_event"."name"', sql)
+        self.assertNotIn('"core_event"."description"', sql)
+
+    def test_unknown_field(self):
+        '''Test requesting an unknown field is rejected.'''
+        res = self.client.get(TICKET_URL, {'fields': 'price,owner'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_fields_with_pagination(self):
+        '''Test cursor links keep working with a narrowed selection.'''
+        Ticket.objects.create(owner=self.user, event=self.event, price=5)
+
+        res = self.client.get(TICKET_URL, {'fields': 'price', 'page_size': 1})
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(res.data['results'], [
+            {'id': self.ticket.id, 'price': '5.00'},
+        ])
+
+
+class ExpandApiTests(TestCase):
+    '''Test inlining related objects with `?expand=`.'''
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.client.force_authenticate(self.user)
+        self.organizer = create_user(
+            email='organizer@example.com', password='pass123', name='Org',
+        )
+        self.event = create_event(self.organizer, capacity=5)
+        self.ticket = Ticket.objects.create(
+            owner=self.user, event=self.event, price=5,
+        )
+
+    def test_expand_event(self):
+        '''Test the ticket's event is inlined like the event API.'''
+        res = self.client.get(TICKET_URL, {'expand': 'event'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ticket = res.data['results'][0]
+        self.assertEqual(ticket['event'], EventSerializer(self.event).data)
+        self.assertEqual(ticket['price'], '5.00')
+
+    def test_expand_event_owner(self):
+        '''Test the event owner is inlined with public details only.'''
+        res = self.client.get(TICKET_URL, {'expand': 'event.owner'})
+
+        event = res.data['results'][0]['event']
+        self.assertEqual(event['id'], self.event.id)
+        self.assertEqual(event['owner'], {
+            'id': self.organizer.id,
+            'name': 'Org',
+        })
+
+    def test_expand_with_fields(self):
+        '''Test an expanded relation is returned even if not requested.'''
+        res = self.client.get(
+            TICKET_URL, {'expand': 'event', 'fields': 'price'},
+        )
+
+        ticket = res.data['results'][0]
+        self.assertEqual(list(ticket), ['id', 'event', 'price'])
+        self.assertEqual(ticket['event']['name'], self.event.name)
+
+    def test_constant_queries(self):
+        '''Test expanding does not add queries as the page grows.'''
+        for count in (1, 20):
+            Ticket.objects.bulk_create(
+                Ticket(
+                    owner=self.user,
+                    event=create_event(self.organizer),
+                    price=5,
+                )
+                for _ in range(count)
+            )
+
+            with self.assertNumQueries(1):
+                res = self.client.get(
+                    TICKET_URL, {'expand': 'event.owner', 'page_size': 50},
+                )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_unknown_expansion(self):
+        '''Test expanding an unknown relation is rejected.'''
+        for url in (TICKET_URL, EVENTS_URL):
+            res = self.client.get(url, {'expand': 'owner'})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,186 @@
+'''
+Tests for holding seats and paying for holds.
+'''
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ticket, Event, Hold, HoldExpired, Job
+
+HOLD_URL = reverse('ticket:hold-list')
+
+
+def detail_url(hold_id):
+    '''Create and return hold detail URL.'''
+    return reverse('ticket:hold-detail', args=[hold_id])
+
+
+def pay_url(hold_id):
+    '''Create and return hold pay URL.'''
+    return reverse('ticket:hold-pay', args=[hold_id])
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+def expire(hold):
+    '''Move a hold's expiry into the past.'''
+    Hold.objects.filter(pk=hold.pk).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+
+class HoldApiTests(TestCase):
+    '''Test holding seats through the API.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='testpass1')
+        self.client.force_authenticate(self.user)
+        self.event = create_event(self.user, capacity=3)
+
+    def test_auth_required(self):
+        '''Test auth is required to hold seats.'''
+        res = APIClient().post(HOLD_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_hold_takes_seats(self):
+        '''Test a hold takes seats without creating tickets.'''
+        res = self.client.post(
+            HOLD_URL, {'event': self.event.id, 'quantity': 2, 'price': '9.50'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn('expires_at', res.data)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.sold, 2)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_hold_sold_out(self):
+        '''Test holding more seats than are left is rejected.'''
+        res = self.client.post(
+            HOLD_URL, {'event': self.event.id, 'quantity': 4, 'price': '1'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('event', res.data)
+        self.assertFalse(Hold.objects.exists())
+
+    def test_list_limited_to_active_holds_of_user(self):
+        '''Test listing only returns the user's unexpired holds.'''
+        other = create_user(email='other@example.com', password='testpass1')
+        Hold.objects.hold(self.event, other, price=1)
+        expire(Hold.objects.hold(self.event, self.user, price=1))
+        hold = Hold.objects.hold(self.event, self.user, price=1)
+
+        res = self.client.get(HOLD_URL)
+
+        self.assertEqual([item['id'] for item in res.data], [hold.id])
+
+    def test_pay_converts_hold_to_tickets(self):
+        '''Test paying creates paid tickets and removes the hold.'''
+        hold = Hold.objects.hold(
+            self.event, self.user, quantity=2, price=Decimal('7.50'),
+        )
+
+        res = self.client.post(pay_url(hold.id))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        self.assertTrue(all(ticket['paid'] for ticket in res.data))
+        self.assertFalse(Hold.objects.exists())
+        self.assertEqual(Job.objects.run_pending(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.sold, 2)
+        self.assertEqual(self.event.paid_count, 2)
+        self.assertEqual(self.event.revenue, Decimal('15.00'))
+
+    def test_pay_expired_hold(self):
+        '''Test an expired hold cannot be paid.'''
+        hold = Hold.objects.hold(self.event, self.user, price=1)
+        expire(hold)
+        hold.refresh_from_db()
+
+        with self.assertRaises(HoldExpired):
+            hold.pay()
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_pay_twice(self):
+        '''Test a hold is only converted once.'''
+        hold = Hold.objects.hold(self.event, self.user, price=1)
+        self.client.post(pay_url(hold.id))
+
+        res = self.client.post(pay_url(hold.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_cancel_releases_seats(self):
+        '''Test deleting a hold gives its seats back.'''
+        hold = Hold.objects.hold(self.event, self.user, quantity=3, price=1)
+
+        res = self.client.delete(detail_url(hold.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.sold, 0)
+
+
+class ReleaseExpiredHoldsTests(TestCase):
+    '''Test sweeping expired holds.'''
+
+    def setUp(self):
+        self.user = create_user(email='user@example.com', password='testpass1')
+        self.event = create_event(self.user, capacity=10)
+        self.other_event = create_event(self.user, capacity=10)
+
+    def test_release_in_batches(self):
+        '''Test every expired hold is released across batches.'''
+        for _ in range(3):
+            expire(Hold.objects.hold(self.event, self.user, 2, price=1))
+        expire(Hold.objects.hold(self.other_event, self.user, price=1))
+        active = Hold.objects.hold(self.event, self.user, price=1)
+
+        released = Hold.objects.release_expired(batch_size=2)
+
+        self.assertEqual(released, 4)
+        self.assertEqual(list(Hold.objects.all()), [active])
+        self.event.refresh_from_db()
+        self.other_event.refresh_from_db()
+        self.assertEqual(self.event.sold, 1)
+        self.assertEqual(self.other_event.sold, 0)
+
+    def test_command(self):
+        '''Test the command reports the released holds.'''
+        expire(Hold.objects.hold(self.event, self.user, price=1))
+        out = StringIO()
+
+        call_command('release_expired_holds', stdout=out)
+
+        self.assertIn('Released 1 expired holds.', out.getvalue())
+        self.assertFalse(Hold.objects.exists())
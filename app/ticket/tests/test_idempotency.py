@@ -0,0 +1,220 @@
+'''
+Tests for idempotency keys on the ticket write APIs.
+'''
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event, IdempotencyKey, Ticket
+
+TICKET_URL = reverse('ticket:ticket-list')
+BULK_URL = reverse('ticket:ticket-bulk')
+
+
+def pay_url(ticket_id):
+    '''Create and return ticket pay URL.'''
+    return reverse('ticket:ticket-pay', args=[ticket_id])
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class IdempotencyApiTests(TestCase):
+    '''Test replaying requests sent with an Idempotency-Key.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.client.force_authenticate(self.user)
+        self.event = create_event(self.user, capacity=10)
+        self.payload = {'event': self.event.id, 'price': '5.00'}
+
+    def post(self, url, payload=None, key='key-1'):
+        '''Post `payload` as JSON with an idempotency key.'''
+        return self.client.post(
+            url, payload or {}, format='json', HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_create(self):
+        '''Test a retried create returns the first response.'''
+        first = self.post(TICKET_URL, self.payload)
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self.post(TICKET_URL, self.payload)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertFalse(any(
+            'core_ticket' in query['sql'] or 'core_event' in query['sql']
+            for query in queries
+        ))
+
+    def test_without_key(self):
+        '''Test requests without a key are not deduplicated.'''
+        self.client.post(TICKET_URL, self.payload)
+        self.client.post(TICKET_URL, self.payload)
+
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_different_keys(self):
+        '''Test each key creates its own ticket.'''
+        self.post(TICKET_URL, self.payload, key='a')
+        self.post(TICKET_URL, self.payload, key='b')
+
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_keys_scoped_to_user(self):
+        '''Test another user's key does not replay their response.'''
+        self.post(TICKET_URL, self.payload)
+        other = create_user(email='other@example.com', password='pass123')
+        self.client.force_authenticate(other)
+
+        res = self.post(TICKET_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', res)
+        self.assertEqual(Ticket.objects.filter(owner=other).count(), 1)
+
+    def test_reused_key_rejected(self):
+        '''Test a key sent with a different request is rejected.'''
+        self.post(TICKET_URL, self.payload)
+
+        res = self.post(TICKET_URL, {**self.payload, 'price': '6.00'})
+
+        self.assertEqual(
+            res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_error_not_stored(self):
+        '''Test a failed request can be retried with the same key.'''
+        res = self.post(TICKET_URL, {'event': self.event.id})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        res = self.post(TICKET_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_expired_key_reused(self):
+        '''Test an expired key is treated as new.'''
+        self.post(TICKET_URL, self.payload)
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+
+        res = self.post(TICKET_URL, self.payload)
+
+        self.assertNotIn('Idempotent-Replayed', res)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_invalid_key(self):
+        '''Test an overlong key is rejected.'''
+        res = self.post(TICKET_URL, self.payload, key='k' * 256)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_retry_replays_pay(self):
+        '''Test a retried payment returns the first response.'''
+        ticket = Ticket.objects.create(
+            owner=self.user, event=self.event, price=5,
+        )
+        first = self.post(pay_url(ticket.id))
+
+        retry = self.post(pay_url(ticket.id))
+
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.data, first.data)
+        self.assertTrue(retry.data['paid'])
+
+    def test_retry_replays_bulk(self):
+        '''Test a retried bulk purchase returns the first response.'''
+        payload = {'items': [self.payload, self.payload]}
+        first = self.post(BULK_URL, payload)
+
+        retry = self.post(BULK_URL, payload)
+
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_purge_command(self):
+        '''Test expired keys are purged.'''
+        self.post(TICKET_URL, self.payload, key='old')
+        IdempotencyKey.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        self.post(TICKET_URL, self.payload, key='new')
+        out = StringIO()
+
+        call_command('purge_idempotency_keys', stdout=out)
+
+        self.assertIn('Deleted 1 expired idempotency keys.', out.getvalue())
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list('key', flat=True)),
+            ['new'],
+        )
+
+
+# Worker threads must not keep connections to the test database.
+@patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 0})
+class ConcurrentIdempotencyTests(TransactionTestCase):
+    '''Test concurrent retries with the same key.'''
+
+    def test_concurrent_retries_create_once(self):
+        '''Test only one of several simultaneous retries creates a ticket.'''
+        user = create_user(email='user@example.com', password='pass123')
+        event = create_event(user)
+        payload = {'event': event.id, 'price': '5.00'}
+        responses = []
+
+        def send():
+            client = APIClient()
+            client.force_authenticate(user)
+            responses.append(client.post(
+                TICKET_URL, payload, format='json',
+                HTTP_IDEMPOTENCY_KEY='key-1',
+            ))
+            connection.close()
+
+        threads = [threading.Thread(target=send) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(
+            {res.status_code for res in responses},
+            {status.HTTP_201_CREATED},
+        )
+        self.assertEqual(len({res.data['id'] for res in responses}), 1)
@@ -0,0 +1,140 @@
+'''
+Tests for paginating the ticket and event APIs.
+'''
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ticket, Event
+
+TICKET_URL = reverse('ticket:ticket-list')
+EVENTS_URL = reverse('ticket:event-list')
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+def collect_pages(client, url, params):
+    '''Follow `next` links and return every page of results.'''
+    pages = []
+    res = client.get(url, params)
+    while True:
+        pages.append(res.data['results'])
+        if not res.data['next']:
+            return pages
+        res = client.get(res.data['next'])
+
+
+class PaginationApiTests(TestCase):
+    '''Test keyset and limit/offset pagination.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='testpass1')
+        self.client.force_authenticate(self.user)
+        self.event = create_event(user=self.user)
+
+    def create_tickets(self, count):
+        '''Create tickets that all share the same creation time.'''
+        Ticket.objects.bulk_create(
+            Ticket(owner=self.user, event=self.event, price=Decimal('1.00'))
+            for _ in range(count)
+        )
+        Ticket.objects.update(created_at=timezone.now())
+
+    def test_ticket_pages_cover_all_rows_once(self):
+        '''Test following cursors returns each ticket exactly once.'''
+        self.create_tickets(5)
+
+        pages = collect_pages(self.client, TICKET_URL, {'page_size': 2})
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        ids = [item['id'] for page in pages for item in page]
+        expected = Ticket.objects.order_by('-created_at', '-id')
+        self.assertEqual(ids, [ticket.id for ticket in expected])
+
+    def test_previous_link_returns_prior_page(self):
+        '''Test following `previous` returns the earlier page.'''
+        self.create_tickets(4)
+
+        first = self.client.get(TICKET_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertIsNone(first.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNotNone(back.data['next'])
+
+    def test_deep_page_seeks_on_index(self):
+        '''Test a cursor page is an index range on the sort key.'''
+        self.create_tickets(3)
+        first = self.client.get(TICKET_URL, {'page_size': 1})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data['next'])
+
+        sql = next(
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "core_ticket"' in query['sql'] and 'LIMIT' in query['sql']
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+
+        self.assertIn('Index Cond', plan)
+        self.assertIn('ROW(', plan)
+        self.assertNotIn('Filter', plan)
+
+    def test_events_ordered_by_start(self):
+        '''Test events are paginated in chronological order.'''
+        now = timezone.now()
+        later = create_event(user=self.user, started_at=now + timedelta(1))
+        create_event(user=self.user, started_at=now - timedelta(1))
+
+        pages = collect_pages(self.client, EVENTS_URL, {'page_size': 1})
+
+        ids = [item['id'] for page in pages for item in page]
+        expected = Event.objects.order_by('started_at', 'id')
+        self.assertEqual(ids, [event.id for event in expected])
+        self.assertEqual(ids[-1], later.id)
+
+    def test_limit_offset_compatibility(self):
+        '''Test clients sending `limit`/`offset` get offset pagination.'''
+        self.create_tickets(3)
+
+        res = self.client.get(TICKET_URL, {'limit': 2, 'offset': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 3)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_invalid_cursor(self):
+        '''Test an invalid cursor returns an error.'''
+        res = self.client.get(TICKET_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
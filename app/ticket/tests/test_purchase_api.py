@@ -0,0 +1,282 @@
+'''
+Tests for purchasing and paying tickets.
+'''
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ticket, Event, Job, SoldOut
+from ticket.serializers import TicketSerializer
+from ticket.views import TicketViewSet
+
+TICKET_URL = reverse('ticket:ticket-list')
+BULK_URL = reverse('ticket:ticket-bulk')
+
+
+def detail_url(ticket_id):
+    '''Create and return ticket detail URL.'''
+    return reverse('ticket:ticket-detail', args=[ticket_id])
+
+
+def pay_url(ticket_id):
+    '''Create and return ticket pay URL.'''
+    return reverse('ticket:ticket-pay', args=[ticket_id])
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class PurchaseApiTests(TestCase):
+    '''Test buying and paying tickets through the API.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='testpass1')
+        self.client.force_authenticate(self.user)
+
+    def test_create_takes_a_seat(self):
+        '''Test creating a ticket increments the event sold counter.'''
+        event = create_event(user=self.user, capacity=1)
+
+        res = self.client.post(TICKET_URL, {'event': event.id, 'price': 5})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        event.refresh_from_db()
+        self.assertEqual(event.sold, 1)
+
+    def test_create_sold_out(self):
+        '''Test creating a ticket for a full event fails.'''
+        event = create_event(user=self.user, capacity=1)
+        self.client.post(TICKET_URL, {'event': event.id, 'price': 5})
+
+        res = self.client.post(TICKET_URL, {'event': event.id, 'price': 5})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.filter(event=event).count(), 1)
+
+    def test_delete_releases_seat(self):
+        '''Test deleting a ticket gives its seat back.'''
+        event = create_event(user=self.user, capacity=1)
+        res = self.client.post(TICKET_URL, {'event': event.id, 'price': 5})
+
+        self.client.delete(detail_url(res.data['id']))
+
+        event.refresh_from_db()
+        self.assertEqual(event.sold, 0)
+
+    def test_change_event_moves_seat(self):
+        '''Test moving a ticket to a full event fails.'''
+        event = create_event(user=self.user)
+        full = create_event(user=self.user, capacity=0)
+        res = self.client.post(TICKET_URL, {'event': event.id, 'price': 5})
+
+        res = self.client.patch(detail_url(res.data['id']), {'event': full.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        event.refresh_from_db()
+        self.assertEqual(event.sold, 1)
+
+    def test_concurrent_delete_counted_once(self):
+        '''Test a second delete of a ticket loaded earlier changes nothing.'''
+        event = create_event(user=self.user, capacity=2)
+        Ticket.objects.purchase(event, self.user, price=5)
+        ticket = Ticket.objects.purchase(event, self.user, price=5)
+        stale = Ticket.objects.get(pk=ticket.pk)
+        ticket.pay()
+
+        TicketViewSet().perform_destroy(ticket)
+        TicketViewSet().perform_destroy(stale)
+
+        event.refresh_from_db()
+        self.assertEqual(event.sold, 1)
+        Job.objects.run_pending()
+        event.refresh_from_db()
+        self.assertEqual(event.paid_count, 0)
+        self.assertEqual(event.revenue, 0)
+
+    def test_delete_counts_concurrent_payment(self):
+        '''Test deleting a copy loaded before payment refunds it.'''
+        event = create_event(user=self.user)
+        ticket = Ticket.objects.purchase(event, self.user, price=5)
+        stale = Ticket.objects.get(pk=ticket.pk)
+        ticket.pay()
+
+        TicketViewSet().perform_destroy(stale)
+
+        Job.objects.run_pending()
+        event.refresh_from_db()
+        self.assertEqual(event.paid_count, 0)
+        self.assertEqual(event.revenue, 0)
+
+    def test_concurrent_moves_counted_once(self):
+        '''Test two updates moving a ticket to another event move once.'''
+        event = create_event(user=self.user)
+        other = create_event(user=self.user)
+        ticket = Ticket.objects.purchase(event, self.user, price=5)
+        copies = [Ticket.objects.get(pk=ticket.pk) for _ in range(2)]
+
+        for copy in copies:
+            serializer = TicketSerializer(
+                copy, data={'event': other.id}, partial=True,
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+        event.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(event.sold, 0)
+        self.assertEqual(other.sold, 1)
+
+    def test_update_keeps_concurrent_payment(self):
+        '''Test updating a copy loaded before payment keeps it paid.'''
+        event = create_event(user=self.user)
+        ticket = Ticket.objects.purchase(event, self.user, price=5)
+        stale = Ticket.objects.get(pk=ticket.pk)
+        ticket.pay()
+
+        serializer = TicketSerializer(
+            stale, data={'price': '7.00'}, partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        ticket.refresh_from_db()
+        self.assertTrue(ticket.paid)
+        Job.objects.run_pending()
+        event.refresh_from_db()
+        self.assertEqual(event.paid_count, 1)
+        self.assertEqual(event.revenue, Decimal('7.00'))
+
+    def test_pay_ticket(self):
+        '''Test paying a ticket once succeeds and twice fails.'''
+        ticket = Ticket.objects.purchase(
+            event=create_event(user=self.user),
+            owner=self.user,
+            price=Decimal('5.00'),
+        )
+
+        res = self.client.post(pay_url(ticket.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['paid'])
+        self.assertIsNotNone(res.data['paid_at'])
+
+        res = self.client.post(pay_url(ticket.id))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkPurchaseApiTests(TestCase):
+    '''Test buying tickets in bulk.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='testpass1')
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_purchase(self):
+        '''Test buying tickets for several events in one request.'''
+        first = create_event(user=self.user)
+        second = create_event(user=self.user, capacity=5)
+        items = [
+            {'event': first.id, 'price': '5.00'},
+            {'event': second.id, 'price': '7.00'},
+            {'event': second.id, 'price': '7.00'},
+        ]
+
+        with self.assertNumQueries(6):
+            res = self.client.post(BULK_URL, {'items': items}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        statuses = [result['status'] for result in res.data['results']]
+        self.assertEqual(statuses, ['created'] * 3)
+        self.assertEqual(Ticket.objects.filter(owner=self.user).count(), 3)
+        second.refresh_from_db()
+        self.assertEqual(second.sold, 2)
+
+    def test_bulk_atomic_rolls_back(self):
+        '''Test a sold out event fails the whole atomic batch.'''
+        event = create_event(user=self.user)
+        full = create_event(user=self.user, capacity=1)
+        items = [
+            {'event': event.id, 'price': '5.00'},
+            {'event': full.id, 'price': '5.00'},
+            {'event': full.id, 'price': '5.00'},
+        ]
+
+        res = self.client.post(BULK_URL, {'items': items}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        statuses = [result['status'] for result in res.data['results']]
+        self.assertEqual(statuses, ['skipped', 'failed', 'failed'])
+        self.assertFalse(Ticket.objects.exists())
+        event.refresh_from_db()
+        self.assertEqual(event.sold, 0)
+
+    def test_bulk_partial(self):
+        '''Test partial mode keeps every purchase that fits.'''
+        full = create_event(user=self.user, capacity=1)
+        items = [
+            {'event': full.id, 'price': '5.00'},
+            {'event': full.id, 'price': '5.00'},
+            {'event': 0, 'price': '5.00'},
+        ]
+        payload = {'mode': 'partial', 'items': items}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        statuses = [result['status'] for result in res.data['results']]
+        self.assertEqual(statuses, ['created', 'failed', 'failed'])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+
+class ConcurrentPurchaseTests(TransactionTestCase):
+    '''Test concurrent purchases never oversell an event.'''
+
+    def test_no_double_sell(self):
+        '''Test parallel purchases stop exactly at capacity.'''
+        user = create_user(email='user@example.com', password='testpass1')
+        event = create_event(user=user, capacity=3)
+        results = []
+
+        def buy():
+            try:
+                Ticket.objects.purchase(event, user, price=Decimal('5.00'))
+                results.append(True)
+            except SoldOut:
+                results.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        event.refresh_from_db()
+        self.assertEqual(results.count(True), 3)
+        self.assertEqual(event.sold, 3)
+        self.assertEqual(Ticket.objects.filter(event=event).count(), 3)
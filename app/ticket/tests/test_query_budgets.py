@@ -0,0 +1,77 @@
+'''
+Query budgets for the ticket API actions.
+'''
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core.models import Ticket, Event
+from core.testing import QueryBudgetMixin
+
+TICKET_URL = reverse('ticket:ticket-list')
+EVENTS_URL = reverse('ticket:event-list')
+
+
+class TicketQueryBudgetTests(QueryBudgetMixin, TestCase):
+    '''Test ticket and event actions stay within their query budgets.'''
+    query_budgets = {
+        'TicketViewSet.list': 1,
+        'TicketViewSet.retrieve': 1,
+        'TicketViewSet.create': 5,
+        'TicketViewSet.pay': 5,
+        'EventViewSet.list': 1,
+        'EventViewSet.retrieve': 1,
+        'EventViewSet.stats': 1,
+        'UpcomingEventViewSet.list': 1,
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass1',
+        )
+        self.client.force_authenticate(self.user)
+        self.events = Event.objects.bulk_create(
+            Event(
+                owner=self.user,
+                name=f'Event {index}',
+                description='Test description',
+                started_at=timezone.now(),
+                duration_hours=5,
+            )
+            for index in range(5)
+        )
+        self.tickets = Ticket.objects.bulk_create(
+            Ticket(owner=self.user, event=event, price=Decimal('5.00'))
+            for event in self.events * 4
+        )
+
+    def test_read_actions(self):
+        '''Test list and detail reads do not grow with the data.'''
+        ticket = self.tickets[0]
+        for url in (
+            TICKET_URL,
+            reverse('ticket:ticket-detail', args=[ticket.id]),
+            EVENTS_URL,
+            reverse('ticket:event-detail', args=[self.events[0].id]),
+            reverse('ticket:event-stats', args=[self.events[0].id]),
+            reverse('ticket:upcoming-list'),
+        ):
+            self.assertWithinQueryBudget(self.client.get(url))
+
+    def test_write_actions(self):
+        '''Test create and pay stay within budget.'''
+        payload = {'event': self.events[0].id, 'price': '5.00'}
+        res = self.client.post(TICKET_URL, payload)
+        self.assertWithinQueryBudget(res)
+
+        url = reverse('ticket:ticket-pay', args=[res.data['id']])
+        self.assertWithinQueryBudget(self.client.post(url))
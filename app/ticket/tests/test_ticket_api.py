@@ -85,7 +85,7 @@ class PrivateTicketAPITests(TestCase):
         tickets = Ticket.objects.filter(event=event).order_by('-created_at')
         serializer = TicketSerializer(tickets, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tickets_limited_to_user(self):
         '''Test retrieving tickets for user.'''
@@ -103,7 +103,7 @@ class PrivateTicketAPITests(TestCase):
         serializer = TicketSerializer(tickets, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_ticket_detail(self):
         '''Test viewing a ticket detail.'''
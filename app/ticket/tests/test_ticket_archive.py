@@ -0,0 +1,183 @@
+'''
+Tests for archiving the tickets of past events.
+'''
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import ArchivedTicket, Event, Ticket
+
+TICKET_URL = reverse('ticket:ticket-list')
+
+
+def detail_url(ticket_id):
+    '''Create and return ticket detail URL.'''
+    return reverse('ticket:ticket-detail', args=[ticket_id])
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, **params):
+    '''Create and return a new event.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now(),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class ArchiveTicketsTests(TestCase):
+    '''Test moving tickets of ended events to the archive.'''
+
+    def setUp(self):
+        self.user = create_user(email='user@example.com', password='pass123')
+        now = timezone.now()
+        self.past = create_event(
+            self.user, started_at=now - timedelta(days=1), duration_hours=2,
+        )
+        self.running = create_event(
+            self.user, started_at=now - timedelta(hours=1), duration_hours=2,
+        )
+        self.upcoming = create_event(
+            self.user, started_at=now + timedelta(days=1),
+        )
+
+    def buy(self, event, **fields):
+        '''Buy a ticket for `event`.'''
+        return Ticket.objects.purchase(event, self.user, price=5, **fields)
+
+    def test_archive_in_batches(self):
+        '''Test only tickets of ended events are moved, across batches.'''
+        past = [self.buy(self.past) for _ in range(3)]
+        kept = [self.buy(self.running), self.buy(self.upcoming)]
+
+        archived = Ticket.objects.archive_past(batch_size=2)
+
+        self.assertEqual(archived, 3)
+        self.assertEqual(
+            sorted(Ticket.objects.values_list('id', flat=True)),
+            sorted(ticket.id for ticket in kept),
+        )
+        self.assertEqual(
+            sorted(ArchivedTicket.objects.values_list('id', flat=True)),
+            sorted(ticket.id for ticket in past),
+        )
+        self.past.refresh_from_db()
+        self.assertEqual(self.past.sold, 3)
+
+    def test_archived_ticket_keeps_fields(self):
+        '''Test an archived ticket keeps its id, price and payment.'''
+        ticket = self.buy(self.past, paid=True, paid_at=timezone.now())
+
+        Ticket.objects.archive_past()
+
+        archived = ArchivedTicket.objects.get()
+        self.assertEqual(archived.id, ticket.id)
+        self.assertEqual(archived.created_at, ticket.created_at)
+        self.assertEqual(archived.price, ticket.price)
+        self.assertTrue(archived.paid)
+        self.assertIsNotNone(archived.archived_at)
+
+    def test_command(self):
+        '''Test the command reports the archived tickets.'''
+        self.buy(self.past)
+        out = StringIO()
+
+        call_command('archive_tickets', stdout=out)
+
+        self.assertIn('Archived 1 tickets.', out.getvalue())
+
+
+class TicketHistoryApiTests(TestCase):
+    '''Test listing and retrieving archived tickets.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.client.force_authenticate(self.user)
+        self.past = create_event(
+            self.user,
+            started_at=timezone.now() - timedelta(days=1),
+            duration_hours=2,
+        )
+        self.archived = Ticket.objects.create(
+            owner=self.user, event=self.past, price=5,
+        )
+        self.current = Ticket.objects.create(
+            owner=self.user, event=create_event(self.user), price=5,
+        )
+        Ticket.objects.archive_past()
+
+    def test_list_excludes_archived(self):
+        '''Test the list only shows current tickets by default.'''
+        res = self.client.get(TICKET_URL)
+
+        self.assertEqual(
+            [item['id'] for item in res.data['results']], [self.current.id],
+        )
+
+    def test_list_include_past(self):
+        '''Test archived tickets are listed on request, newest first.'''
+        other = create_user(email='other@example.com', password='pass123')
+        Ticket.objects.create(owner=other, event=self.past, price=5)
+        Ticket.objects.archive_past()
+
+        res = self.client.get(
+            TICKET_URL, {'include_past': 'true', 'expand': 'event'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [self.current.id, self.archived.id],
+        )
+        self.assertEqual(
+            res.data['results'][1]['event']['id'], self.past.id,
+        )
+
+    def test_list_include_past_paginated(self):
+        '''Test cursor pagination walks across both tables.'''
+        res = self.client.get(
+            TICKET_URL, {'include_past': 'true', 'page_size': 1},
+        )
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            [item['id'] for item in res.data['results']], [self.archived.id],
+        )
+
+    def test_invalid_include_past(self):
+        '''Test an invalid flag is rejected.'''
+        res = self.client.get(TICKET_URL, {'include_past': 'maybe'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('include_past', res.data)
+
+    def test_retrieve_archived(self):
+        '''Test an archived ticket can still be retrieved.'''
+        res = self.client.get(detail_url(self.archived.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], self.archived.id)
+        self.assertEqual(res.data['event'], self.past.id)
+
+    def test_archived_read_only(self):
+        '''Test archived tickets cannot be changed.'''
+        res = self.client.patch(detail_url(self.archived.id), {'price': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,105 @@
+'''
+Tests for the upcoming events feed.
+'''
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ticket, Event
+
+UPCOMING_URL = reverse('ticket:upcoming-list')
+
+
+def create_user(**params):
+    '''Create and return a new user.'''
+    return get_user_model().objects.create_user(**params)
+
+
+def create_event(user, days, **params):
+    '''Create and return an event starting in `days` days.'''
+    defaults = {
+        'name': 'Test event',
+        'description': 'Test description',
+        'started_at': timezone.now() + timedelta(days=days),
+        'duration_hours': 5,
+    }
+    defaults.update(params)
+
+    return Event.objects.create(owner=user, **defaults)
+
+
+class UpcomingApiTests(TestCase):
+    '''Test listing the user's upcoming events.'''
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.client.force_authenticate(self.user)
+
+    def buy(self, event, count=1, owner=None):
+        '''Buy `count` tickets for `event`.'''
+        for _ in range(count):
+            Ticket.objects.create(
+                owner=owner or self.user, event=event, price=5,
+            )
+
+    def test_auth_required(self):
+        '''Test auth is required for the feed.'''
+        res = APIClient().get(UPCOMING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_distinct_events_with_counts(self):
+        '''Test each event is listed once with the user's ticket count.'''
+        other = create_user(email='other@example.com', password='pass123')
+        later = create_event(self.user, 2, name='Later')
+        sooner = create_event(self.user, 1, name='Sooner')
+        self.buy(later, 3)
+        self.buy(sooner)
+        self.buy(sooner, 2, owner=other)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(UPCOMING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item['name'], item['tickets']) for item in res.data['results']],
+            [('Sooner', 1), ('Later', 3)],
+        )
+
+    def test_excludes_past_and_unticketed_events(self):
+        '''Test past events and events without tickets are left out.'''
+        past = create_event(self.user, -1)
+        upcoming = create_event(self.user, 1)
+        create_event(self.user, 1)
+        self.buy(past)
+        self.buy(upcoming)
+
+        res = self.client.get(UPCOMING_URL)
+
+        self.assertEqual(
+            [item['id'] for item in res.data['results']], [upcoming.id],
+        )
+
+    def test_cursor_pagination(self):
+        '''Test the feed is paginated in start order.'''
+        events = [create_event(self.user, days) for days in (3, 1, 2)]
+        for event in events:
+            self.buy(event, 2)
+
+        res = self.client.get(UPCOMING_URL, {'page_size': 2})
+        first = [item['id'] for item in res.data['results']]
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            first + [item['id'] for item in res.data['results']],
+            [events[1].id, events[2].id, events[0].id],
+        )
+        self.assertEqual(res.data['results'][0]['tickets'], 2)
+        self.assertIsNone(res.data['next'])
@@ -7,14 +7,29 @@ from django.urls import (
 )
 from rest_framework.routers import DefaultRouter
 
-from ticket import views
+from ticket import async_views, views
 
 router = DefaultRouter()
 router.register('ticket', views.TicketViewSet)
 router.register('event', views.EventViewSet)
+router.register('hold', views.HoldViewSet)
+router.register(
+    'upcoming', views.UpcomingEventViewSet, basename='upcoming',
+)
 
 app_name = 'ticket'
 
 urlpatterns = [
     path('', include(router.urls)),
+    path(
+        'async/ticket/',
+        async_views.ticket_list,
+        name='async-ticket-list',
+    ),
+    path(
+        'async/ticket/<int:pk>/',
+        async_views.ticket_detail,
+        name='async-ticket-detail',
+    ),
+    path('async/event/', async_views.event_list, name='async-event-list'),
 ]
@@ -1,28 +1,76 @@
 '''
 Views for the ticket APIs.
 '''
+from django.db import transaction
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from rest_framework import (
     viewsets,
-    mixins
+    mixins,
+    status,
     )
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 
-from core.models import Ticket, Event
-from ticket import serializers
+from core.authentication import CachedTokenAuthentication
+from core.idempotency import idempotent
+from core.models import (
+    Ticket,
+    TicketHistory,
+    Event,
+    Hold,
+    HoldExpired,
+    SoldOut,
+)
+from ticket import exports, serializers
+from ticket.caching import event_cache
+from ticket.conditional import (
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    ConditionalUpdateMixin,
+)
+from ticket.fieldsets import SparseFieldsetMixin
+from ticket.filters import filter_events, include_past_tickets
+from ticket.pagination import TicketPagination, EventPagination
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    ConditionalUpdateMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     '''View for manage ticket APIs.'''
     serializer_class = serializers.TicketDetailSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = TicketPagination
     queryset = Ticket.objects.all()
+    expandable_fields = {
+        'event': serializers.EventSerializer,
+        'event.owner': serializers.OwnerSerializer,
+    }
 
     def get_queryset(self):
-        '''Return objects for the current authenticated user only.'''
-        query = self.queryset.filter(owner=self.request.user)
-        return query.order_by('-created_at')
+        '''
+        Return objects for the current authenticated user only. Lists
+        only include archived tickets of past events on request with
+        `?include_past=true`; retrieve always finds them.
+        '''
+        query = self.queryset
+        if self.action == 'retrieve' or (
+            self.action == 'list' and
+            include_past_tickets(self.request.query_params)
+        ):
+            query = TicketHistory.objects.all()
+        query = query.filter(owner=self.request.user)
+        return query.order_by('-created_at', '-id')
 
     def get_serializer_class(self):
         '''Return appropriate serializer class.'''
@@ -31,14 +79,291 @@ class TicketViewSet(viewsets.ModelViewSet):
 
         return self.serializer_class
 
+    def get_version_relations(self):
+        '''Return the expanded relations, which change list responses.'''
+        return self.get_expand()
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        '''Create a ticket, replaying retries sent with the same key.'''
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         '''Create a new ticket.'''
         serializer.save(owner=self.request.user)
 
+    def perform_destroy(self, instance):
+        '''
+        Delete a ticket and give its seat back to the event. The row is
+        locked and re-read first, so a concurrent delete or payment is
+        never counted twice or missed.
+        '''
+        with transaction.atomic():
+            ticket = Ticket.objects.select_for_update().filter(
+                pk=instance.pk,
+            ).first()
+            if ticket is None:
+                return
+            deleted, _ = ticket.delete()
+            if not deleted:
+                return
+            event = Event(pk=ticket.event_id)
+            event.release_seats()
+            if ticket.paid:
+                event.schedule_payments(-1, -ticket.price)
+
+    @action(detail=True, methods=['post'])
+    @idempotent
+    def pay(self, request, pk=None):
+        '''Pay for a ticket exactly once.'''
+        ticket = self.get_object()
+        if not ticket.pay():
+            raise ValidationError(
+                {'paid': 'This ticket is already paid.'},
+                code='already_paid',
+            )
+
+        serializer = self.get_serializer(ticket)
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        serializer_class=serializers.BulkPurchaseSerializer,
+    )
+    @idempotent
+    def bulk(self, request):
+        '''Buy many tickets in one request.'''
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        atomic = (
+            serializer.validated_data['mode'] ==
+            serializers.BulkPurchaseSerializer.MODE_ATOMIC
+        )
+
+        results, items = self.validate_bulk_items(
+            serializer.validated_data['items']
+        )
+        if atomic and any(results):
+            return self.bulk_response(results)
+
+        purchases = Ticket.objects.purchase_many(
+            self.request.user,
+            [item for item in items if item is not None],
+            atomic=atomic,
+        )
+        outcomes = iter(purchases)
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+            outcome = next(outcomes)
+            if isinstance(outcome, Ticket):
+                results[index] = {
+                    'status': 'created',
+                    'ticket': serializers.TicketSerializer(outcome).data,
+                }
+            elif isinstance(outcome, SoldOut):
+                results[index] = {
+                    'status': 'failed',
+                    'errors': {'event': ['This event is sold out.']},
+                }
+
+        return self.bulk_response(results)
+
+    def validate_bulk_items(self, data):
+        '''Validate bulk items, resolving all events in one query.'''
+        results = [None] * len(data)
+        items = [None] * len(data)
+        for index, item_data in enumerate(data):
+            item = serializers.BulkTicketItemSerializer(data=item_data)
+            if item.is_valid():
+                items[index] = item.validated_data
+            else:
+                results[index] = {'status': 'failed', 'errors': item.errors}
+
+        event_ids = {item['event'] for item in items if item is not None}
+        events = Event.objects.in_bulk(event_ids)
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+            if item['event'] not in events:
+                items[index] = None
+                results[index] = {
+                    'status': 'failed',
+                    'errors': {'event': ['Event does not exist.']},
+                }
+            else:
+                item['event'] = events[item['event']]
+
+        return results, items
+
+    def bulk_response(self, results):
+        '''Return per-item results with an overall status code.'''
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = {'status': 'skipped'}
+            results[index]['index'] = index
+
+        created = sum(result['status'] == 'created' for result in results)
+        if created == len(results):
+            code = status.HTTP_201_CREATED
+        elif created:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+
+        return Response({'results': results}, status=code)
+
+
+class HoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    '''Hold seats while the user pays, then turn them into tickets.'''
+    serializer_class = serializers.HoldSerializer
+    queryset = Hold.objects.all()
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        '''Return the current user's unexpired holds.'''
+        query = self.queryset.filter(
+            owner=self.request.user,
+            expires_at__gt=timezone.now(),
+        )
+        return query.order_by('id')
+
+    def perform_create(self, serializer):
+        '''Hold seats for the current user.'''
+        serializer.save(owner=self.request.user)
 
-class EventViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    def perform_destroy(self, instance):
+        '''Cancel a hold and give its seats back.'''
+        instance.release()
+
+    @action(detail=True, methods=['post'])
+    def pay(self, request, pk=None):
+        '''Pay for a hold, converting it into tickets.'''
+        hold = self.get_object()
+        try:
+            tickets = hold.pay()
+        except HoldExpired:
+            raise ValidationError(
+                {'hold': 'This hold has expired.'},
+                code='hold_expired',
+            )
+
+        serializer = serializers.TicketDetailSerializer(tickets, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class EventViewSet(
+    ConditionalRetrieveMixin,
+    SparseFieldsetMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
     '''Manage events in the database.'''
     serializer_class = serializers.EventSerializer
     queryset = Event.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = EventPagination
+
+    def get_queryset(self):
+        '''Return the events visible to the current action.'''
+        if self.action == 'stats':
+            query = self.queryset.filter(owner=self.request.user)
+            return query.only(
+                'id', 'capacity', 'sold', 'paid_count', 'revenue'
+            )
+        if self.action == 'export':
+            query = self.queryset.filter(owner=self.request.user)
+            return query.only('id')
+        if self.action == 'list':
+            return filter_events(self.queryset, self.request.query_params)
+
+        return self.queryset
+
+    @event_cache.cached
+    def list(self, request, *args, **kwargs):
+        '''List events, served from the catalogue cache when possible.'''
+        return super().list(request, *args, **kwargs)
+
+    @action(
+        detail=True,
+        serializer_class=serializers.EventStatsSerializer,
+    )
+    def stats(self, request, pk=None):
+        '''Return sales counters for an event owned by the user.'''
+        event = self.get_object()
+        serializer = self.get_serializer(event)
+        return Response(serializer.data)
+
+    @action(
+        detail=True,
+        renderer_classes=(
+            exports.CSVRenderer,
+            exports.NDJSONRenderer,
+            JSONRenderer,
+        ),
+    )
+    def export(self, request, pk=None):
+        '''Stream the tickets of an event owned by the user.'''
+        event = self.get_object()
+        default_output = request.accepted_renderer.format
+        if default_output not in ('csv', 'ndjson'):
+            default_output = 'csv'
+        output = request.query_params.get('output', default_output)
+        if output not in ('csv', 'ndjson'):
+            raise ValidationError({'output': 'Must be "csv" or "ndjson".'})
+        try:
+            after = int(request.query_params.get('after', 0))
+        except ValueError:
+            raise ValidationError({'after': 'Must be a ticket id.'})
+
+        rows = exports.ticket_rows(event.pk, after=after)
+        if output == 'csv':
+            content = exports.csv_stream(rows)
+            content_type = 'text/csv'
+        else:
+            content = exports.ndjson_stream(rows)
+            content_type = 'application/x-ndjson'
+
+        gzipped = exports.accepts_gzip(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+        )
+        if gzipped:
+            content = exports.gzip_stream(content)
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="event-{event.pk}-tickets.{output}"'
+        )
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class UpcomingEventViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    '''List the upcoming events the user has tickets for.'''
+    serializer_class = serializers.UpcomingEventSerializer
+    queryset = Event.objects.all()
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = EventPagination
+
+    def get_queryset(self):
+        '''
+        Return the user's distinct upcoming events with how many tickets
+        they hold for each, counted in the same query.
+        '''
+        query = self.queryset.filter(
+            ticket__owner=self.request.user,
+            started_at__gte=timezone.now(),
+        )
+        return query.annotate(ticket_count=Count('ticket'))
@@ -0,0 +1,13 @@
+'''
+Async views for the user API, served natively under ASGI.
+'''
+from core.authentication import token_required
+from core.concurrency import json_response, read_only
+from user.serializers import UserSerializer
+
+
+@read_only
+@token_required
+async def me(request):
+    '''Return the authenticated user without touching the database.'''
+    return json_response(UserSerializer(request.user).data)
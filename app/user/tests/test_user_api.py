@@ -8,9 +8,11 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core.models import AuthToken
 
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
+ROTATE_TOKEN_URL = reverse('user:token-rotate')
 ME_URL = reverse('user:me')
 
 
@@ -81,6 +83,7 @@ class PublicUserApiTests(TestCase):
         res = self.client.post(TOKEN_URL, payload)
 
         self.assertIn('token', res.data)
+        self.assertIn('expires_at', res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
     def test_create_token_invalid_credentials(self):
@@ -166,3 +169,71 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class CachedUserUpdateTests(TestCase):
+    '''Test profile updates made through a cached token lookup.'''
+
+    def setUp(self):
+        self.user = create_user(email='test@exemple.com', password='test123')
+        token = AuthToken.objects.issue(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.client.get(ME_URL)
+
+    def test_update_keeps_changes_made_elsewhere(self):
+        '''Test an update does not write back a stale cached user.'''
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            password='changed-elsewhere',
+        )
+
+        res = self.client.patch(ME_URL, {'name': 'New Name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'New Name')
+        self.assertEqual(self.user.password, 'changed-elsewhere')
+
+    def test_update_rejected_for_deactivated_user(self):
+        '''Test a user deactivated elsewhere cannot update their profile.'''
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False,
+        )
+
+        res = self.client.patch(ME_URL, {'name': 'New Name'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.name, '')
+
+
+class TokenRotationApiTests(TestCase):
+    '''Test rotating auth tokens.'''
+
+    def setUp(self):
+        self.user = create_user(email='test@exemple.com', password='test123')
+        self.token = AuthToken.objects.issue(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_rotate_replaces_token(self):
+        '''Test rotating revokes the old token and issues a new one.'''
+        res = self.client.post(ROTATE_TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(res.data['token'], self.token.key)
+        self.assertEqual(
+            list(self.user.auth_tokens.values_list('key', flat=True)),
+            [res.data['token']],
+        )
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_rotate_requires_token(self):
+        '''Test a token is required to rotate.'''
+        res = APIClient().post(ROTATE_TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
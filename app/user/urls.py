@@ -3,12 +3,18 @@ URL mappings for the user API
 '''
 from django.urls import path
 
-from user import views
+from user import async_views, views
 
 app_name = 'user'
 
 urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
-    path('me/', views.ManageUserView.as_view(), name='me')
+    path(
+        'token/rotate/',
+        views.RotateTokenView.as_view(),
+        name='token-rotate',
+    ),
+    path('me/', views.ManageUserView.as_view(), name='me'),
+    path('async/me/', async_views.me, name='async-me'),
 ]
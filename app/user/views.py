@@ -1,10 +1,18 @@
 '''
 Views for the user API
 '''
-from rest_framework import generics, authentication, permissions
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from core.authentication import CachedTokenAuthentication
+from core.models import AuthToken
+from core.throttling import LoginRateThrottle
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer
@@ -16,18 +24,60 @@ class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
+def token_response(token, status=status.HTTP_200_OK):
+    '''Return the key and expiry of a token.'''
+    return Response(
+        {'token': token.key, 'expires_at': token.expires_at},
+        status=status,
+    )
+
+
 class CreateTokenView(ObtainAuthToken):
     '''Create a new auth token for user.'''
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [LoginRateThrottle]
+
+    def post(self, request, *args, **kwargs):
+        '''Issue a new expiring token for valid credentials.'''
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = AuthToken.objects.issue(serializer.validated_data['user'])
+        return token_response(token)
+
+
+class RotateTokenView(APIView):
+    '''Replace the token used for the request with a new one.'''
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        '''Revoke the current token and issue a new one.'''
+        with transaction.atomic():
+            request.auth.delete()
+            token = AuthToken.objects.issue(request.user)
+        return token_response(token, status=status.HTTP_201_CREATED)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     '''Manage the authenticated user.'''
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        '''Retrieve and return authenticated user.'''
-        return self.request.user
+        '''
+        Retrieve and return authenticated user. The authenticated user may
+        be a cached copy, so it is reloaded before being written back.
+        '''
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+
+        user = get_user_model().objects.filter(
+            pk=self.request.user.pk, is_active=True,
+        ).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return user